@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Times number-heavy Lox code with and without inferred and type-specialised Binary nodes.
+
+Run with `python -m benchmarks.arithmetic [--n N] [--repeat N]`.
+"""
+import argparse
+
+from lox import infer, specialize
+from benchmarks.common import run_lox
+
+SOURCE = '''
+fun fib(n) {{
+    if (n < 2) return n;
+    return fib(n - 1) + fib(n - 2);
+}}
+fun series(count) {{
+    var total = 0;
+    for (var i = 0; i < count; i = i + 1) {{
+        total = total + i * 2 / 3 - 1;
+    }}
+    return total;
+}}
+print fib({n}) + series({n} * 1000);
+'''
+
+
+def best_of(repeat: int, source: str) -> float:
+    return min(run_lox(source)[0] for _ in range(repeat))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--n', type=int, default=20)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = SOURCE.format(n=args.n)
+    print(f'inferred and specialised: {best_of(args.repeat, source):.2f}s')
+
+    infer_types = infer.TypeInference.infer
+    specialization = specialize.specialization
+    infer.TypeInference.infer = lambda self, statements: []
+    try:
+        print(f'specialised only:         {best_of(args.repeat, source):.2f}s')
+        specialize.specialization = lambda operator, lhs, rhs: specialize.GenericBinary
+        print(f'generic:                  {best_of(args.repeat, source):.2f}s')
+    finally:
+        infer.TypeInference.infer = infer_types
+        specialize.specialization = specialization
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Times calls and closure creation, and measures what long-lived closures keep alive.
+
+Run with `python -m benchmarks.closures [--calls N] [--closures N]`.
+Each kept closure is made by a function with a few locals it doesn't capture,
+which a closure holding its whole scope would keep alive as well.
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import run_lox
+
+CALLS = '''
+fun add(a, b) {{ var c = a + b; return c; }}
+var total = 0;
+for (var i = 0; i < {calls}; i = i + 1) {{
+    total = add(total, i);
+}}
+'''
+
+CLOSURES = '''
+fun makeCounter(start) {{
+    var count = start;
+    var label = "counter " + "{padding}";
+    var step = 1;
+    var unused = label + label;
+    fun counter() {{ count = count + step; return count; }}
+    return counter;
+}}
+var counters = nil;
+fun keep(counter, rest) {{ fun pair() {{ return rest; }} counter(); return pair; }}
+for (var i = 0; i < {closures}; i = i + 1) {{
+    counters = keep(makeCounter(i), counters);
+}}
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--calls', type=int, default=100_000)
+    arg_parser.add_argument('--closures', type=int, default=20_000)
+    args = arg_parser.parse_args()
+
+    elapsed, _ = run_lox(CALLS.format(calls=args.calls))
+    print(f'calls:    {args.calls} in {elapsed:.2f}s ({args.calls / elapsed:,.0f}/s)')
+
+    source = CLOSURES.format(closures=args.closures, padding='x' * 64)
+    tracemalloc.start()
+    start = time.perf_counter()
+    run_lox(source)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'closures: {args.closures} in {elapsed:.2f}s, peak {peak / 1e6:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
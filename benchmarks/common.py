@@ -0,0 +1,21 @@
+import contextlib
+import io
+import time
+
+from lox.lox import Lox
+
+
+def run_lox(source: str, capture_output: bool = True):
+    """Runs `source` on a fresh interpreter and returns (seconds, output)."""
+    lox = Lox()
+    output = io.StringIO()
+    redirect = contextlib.redirect_stdout(output) if capture_output else contextlib.nullcontext()
+
+    with redirect:
+        start = time.perf_counter()
+        lox.run(source)
+        elapsed = time.perf_counter() - start
+
+    if lox.had_error or lox.had_runtime_error:
+        raise RuntimeError(f'Benchmark script failed:\n{output.getvalue()}')
+    return elapsed, output.getvalue()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Times reading a file line by line with readLine, plain and memory-mapped, against Python's own file iteration.
+
+Run with `python -m benchmarks.file_lines [--lines N] [--repeat N]`.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import run_lox
+
+SOURCE = '''
+var file = {open};
+var count = 0;
+var line = readLine(file);
+while (line != nil) {{
+    count = count + 1;
+    line = readLine(file);
+}}
+close(file);
+print count;
+'''
+
+# The same loop without the reads, to tell the interpreter's share apart.
+LOOP_ONLY = '''
+var count = 0;
+var line = "";
+while (count < {lines}) {{
+    count = count + 1;
+    line = "";
+}}
+print count;
+'''
+
+
+def write_lines(path: str, lines: int):
+    with open(path, 'w') as file:
+        for i in range(lines):
+            file.write(f'2024-01-01T00:00:00 INFO request {i} served in {i % 997}ms\n')
+
+
+def python_lines(path: str) -> float:
+    start = time.perf_counter()
+    count = 0
+    with open(path, 'r') as file:
+        for _ in file:
+            count += 1
+    return time.perf_counter() - start
+
+
+def peak_memory(source: str) -> int:
+    tracemalloc.start()
+    try:
+        run_lox(source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=500_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'log.txt')
+        write_lines(path, args.lines)
+
+        def rate(seconds):
+            return f'{args.lines / seconds:12,.0f} lines/s'
+
+        print(f'{args.lines} lines, {os.path.getsize(path) / 2 ** 20:.1f} MiB')
+        print(f'python for line in file: {rate(min(python_lines(path) for _ in range(args.repeat)))}')
+        for name, open_call in (('openFile', f'openFile("{path}", "r")'), ('mapFile', f'mapFile("{path}")')):
+            seconds = min(run_lox(SOURCE.format(open=open_call))[0] for _ in range(args.repeat))
+            print(f'lox readLine, {name + ":":9}    {rate(seconds)}')
+        loop = min(run_lox(LOOP_ONLY.format(lines=args.lines))[0] for _ in range(args.repeat))
+        print(f'lox loop without reads: {rate(loop)}')
+
+        # Peak memory has to stay the same however long the file is.
+        small = os.path.join(directory, 'small.txt')
+        write_lines(small, args.lines // 10)
+        for name, file in (('1/10 of the lines', small), ('all lines', path)):
+            peak = peak_memory(SOURCE.format(open=f'openFile("{file}", "r")'))
+            print(f'peak traced memory, {name + ":":18} {peak / 1024:8.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Times a counting `for` loop against the `while` loop it used to be desugared into.
+
+Run with `python -m benchmarks.for_loop [--iterations N] [--repeat N]`.
+Reports the best of `--repeat` runs of each.
+"""
+import argparse
+
+from benchmarks.common import run_lox
+
+FOR_LOOP = '''
+var total = 0;
+for (var i = 0; i < {iterations}; i = i + 1) {{
+    total = total + i;
+}}
+print total;
+'''
+
+DESUGARED = '''
+var total = 0;
+{{
+    var i = 0;
+    while (i < {iterations}) {{
+        {{
+            total = total + i;
+        }}
+        i = i + 1;
+    }}
+}}
+print total;
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--iterations', type=int, default=1_000_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for name, source in (('for', FOR_LOOP), ('desugared', DESUGARED)):
+        source = source.format(iterations=args.iterations)
+        elapsed = min(run_lox(source)[0] for _ in range(args.repeat))
+        print(f'{name + ":":<11}{args.iterations} iterations in {elapsed:.2f}s '
+              f'({args.iterations / elapsed:,.0f}/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Times a loop that keeps reading and assigning globals and calling global functions.
+
+Run with `python -m benchmarks.globals [--iterations N] [--repeat N]`.
+"""
+import argparse
+
+from benchmarks.common import run_lox
+
+SOURCE = '''
+var scale = 3;
+var offset = 1;
+var total = 0;
+fun step(x) {{ return x * scale + offset; }}
+class Counter {{ init() {{ this.count = 0; }} }}
+var i = 0;
+while (i < {iterations}) {{
+    total = total + step(i);
+    Counter;
+    i = i + 1;
+}}
+print total;
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--iterations', type=int, default=200_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = SOURCE.format(iterations=args.iterations)
+    elapsed = min(run_lox(source)[0] for _ in range(args.repeat))
+    print(f'{args.iterations} iterations in {elapsed:.2f}s ({args.iterations / elapsed:,.0f}/s)')
+
+
+if __name__ == '__main__':
+    main()
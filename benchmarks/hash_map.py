@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Compares keyed lookups in a hashMap with a linear search through a linked list of instances.
+
+Run with `python -m benchmarks.hash_map [--entries N] [--lookups N] [--repeat N]`.
+"""
+import argparse
+
+from benchmarks.common import run_lox
+
+# How lookup tables were written before there were maps.
+LINKED_LIST = '''
+class Entry {{
+    init(key, value, next) {{ this.key = key; this.value = value; this.next = next; }}
+}}
+fun find(entry, key) {{
+    while (entry != nil) {{
+        if (entry.key == key) return entry.value;
+        entry = entry.next;
+    }}
+    return nil;
+}}
+var table = nil;
+for (var i = 0; i < {entries}; i = i + 1) table = Entry(i, i * 2, table);
+var total = 0;
+var key = 0;
+for (var i = 0; i < {lookups}; i = i + 1) {{
+    total = total + find(table, key);
+    key = key + 1;
+    if (key == {entries}) key = 0;
+}}
+print total;
+'''
+
+HASH_MAP = '''
+var table = hashMap();
+for (var i = 0; i < {entries}; i = i + 1) set(table, i, i * 2);
+var total = 0;
+var key = 0;
+for (var i = 0; i < {lookups}; i = i + 1) {{
+    total = total + get(table, key);
+    key = key + 1;
+    if (key == {entries}) key = 0;
+}}
+print total;
+'''
+
+
+def best_of(repeat: int, source: str) -> tuple[float, str]:
+    return min(run_lox(source) for _ in range(repeat))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--entries', type=int, default=200)
+    arg_parser.add_argument('--lookups', type=int, default=5_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    linked_seconds, linked_output = best_of(args.repeat, LINKED_LIST.format(**vars(args)))
+    map_seconds, map_output = best_of(args.repeat, HASH_MAP.format(**vars(args)))
+    assert linked_output == map_output, (linked_output, map_output)
+
+    print(f'{args.lookups} lookups among {args.entries} entries')
+    print(f'linked list of instances: {linked_seconds:.2f}s')
+    print(f'hashMap:                  {map_seconds:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
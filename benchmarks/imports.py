@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Times scripts that import a library, cold, from the on-disk cache, and from the in-process cache.
+
+Run with `python -m benchmarks.imports [--functions N] [--scripts N]`.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import run_lox
+from benchmarks.repl_latency import PRELUDE_ENTRY
+from lox import modules
+
+SCRIPT = '''
+import "{path}";
+print helper{last}(1);
+'''
+
+
+def forget_loaded_modules():
+    # What a new process starts with; the on-disk cache is kept.
+    modules.imported.clear()
+    modules.modules.clear()
+    modules.compiled.clear()
+
+
+def time_scripts(source: str, scripts: int) -> float:
+    start = time.perf_counter()
+    for _ in range(scripts):
+        run_lox(source)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=2000, help='classes and functions in the library')
+    arg_parser.add_argument('--scripts', type=int, default=100, help='scripts run against the warm cache')
+    args = arg_parser.parse_args()
+
+    library = ''.join(PRELUDE_ENTRY.format(i=i) for i in range(args.functions))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'library.lox')
+        with open(path, 'w') as file:
+            file.write(library)
+        script = SCRIPT.format(path=path, last=args.functions - 1)
+
+        inline = time_scripts(library + script.split(';', 1)[1], 1)
+        cold = time_scripts(script, 1)
+        forget_loaded_modules()
+        disk = time_scripts(script, 1)
+        warm = time_scripts(script, args.scripts) / args.scripts
+
+    print(f'library of {args.functions} classes/functions ({len(library.splitlines())} lines)')
+    print(f'library pasted into the script:  {inline * 1000:8.1f}ms')
+    print(f'first import, compiling:         {cold * 1000:8.1f}ms')
+    print(f'first import in a new process:   {disk * 1000:8.1f}ms')
+    print(f'import already loaded:           {warm * 1000:8.1f}ms per script')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Compares running fib() jobs one after another with running them via spawn/join.
+
+Run with `python -m benchmarks.parallel_spawn [--jobs N] [--n N]`.
+"""
+import argparse
+import os
+
+from benchmarks.common import run_lox
+
+FIB = '''
+fun fib(n) {{
+    if (n <= 1) return n;
+    return fib(n - 1) + fib(n - 2);
+}}
+'''
+
+SEQUENTIAL = FIB + '''
+for (var i = 0; i < {jobs}; i = i + 1) {{
+    print fib({n});
+}}
+'''
+
+PARALLEL = FIB + '''
+{spawns}
+{joins}
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    arg_parser.add_argument('--n', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    sequential, _ = run_lox(SEQUENTIAL.format(jobs=args.jobs, n=args.n))
+    spawns = '\n'.join(f'var f{i} = spawn(fib, {args.n});' for i in range(args.jobs))
+    joins = '\n'.join(f'print join(f{i});' for i in range(args.jobs))
+    parallel, _ = run_lox(PARALLEL.format(spawns=spawns, joins=joins))
+
+    print(f'{args.jobs} x fib({args.n}) on {os.cpu_count()} cores')
+    print(f'sequential: {sequential:.2f}s')
+    print(f'spawn/join: {parallel:.2f}s ({sequential / parallel:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
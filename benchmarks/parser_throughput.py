@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Measures how fast the parser gets through expression-heavy source.
+
+Run with `python -m benchmarks.parser_throughput [--statements N] [--repeat N]`.
+"""
+import argparse
+import random
+import time
+
+from lox.lox import Lox
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+OPERATORS = ['+', '-', '*', '/', '<', '<=', '>', '>=', '==', '!=', 'and', 'or']
+
+
+def expression(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(['x', 'y', '1', '2.5', 'true', 'nil', '"s"', 'f(x)', 'a.b', '-x', '!y'])
+    if rng.random() < 0.15:
+        return f'({expression(rng, depth - 1)})'
+    return f'{expression(rng, depth - 1)} {rng.choice(OPERATORS)} {expression(rng, depth - 1)}'
+
+
+def source(statements: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(statements):
+        lines.append(f'var v{i} = {expression(rng, 4)};')
+        lines.append(f'v{i} = x = {expression(rng, 3)};')
+    return '\n'.join(lines)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--statements', type=int, default=2000)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    code = source(args.statements)
+    tokens = Scanner(code, Lox()).scan_tokens()
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        Parser(tokens, Lox()).parse()
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{len(tokens)} tokens parsed in {best * 1000:.1f}ms ({len(tokens) / best / 1000:.0f}k tokens/s)')
+
+
+if __name__ == '__main__':
+    main()
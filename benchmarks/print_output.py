@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compares print statements written through the buffered output with a `print` call per line.
+
+Run with `python -m benchmarks.print_output [--lines N] [--repeat N]`.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from lox import util
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+from lox.output import Output
+
+# Five lines per iteration, so that printing rather than looping dominates.
+SOURCE = '''
+for (var i = 0; i < {lines} / 5; i = i + 1) {{
+    print i;
+    print "a line of output";
+    print i * 2;
+    print "another line";
+    print i * 3;
+}}
+'''
+
+
+def unbuffered_print(self, printstmt):
+    # What Interpreter.on_print used to do.
+    print(util.stringified(self._evaluate(printstmt.expr)))
+
+
+def time_run(source: str, file) -> float:
+    lox = Lox(output=Output(file))
+    with contextlib.redirect_stdout(file):
+        start = time.perf_counter()
+        lox.run(source)
+        return time.perf_counter() - start
+
+
+def best_of(repeat: int, source: str, make_file) -> float:
+    times = []
+    for _ in range(repeat):
+        with make_file() as file:
+            times.append(time_run(source, file))
+    return min(times)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=200_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = SOURCE.format(lines=args.lines)
+    sinks = {
+        'file': lambda: tempfile.TemporaryFile('w+'),
+        # A line buffered file behaves like stdout on a terminal.
+        'line buffered file': lambda: tempfile.TemporaryFile('w+', buffering=1),
+        'in-memory buffer': io.StringIO,
+    }
+
+    on_print = Interpreter.on_print
+    for name, make_file in sinks.items():
+        buffered = best_of(args.repeat, source, make_file)
+        Interpreter.on_print = unbuffered_print
+        try:
+            unbuffered = best_of(args.repeat, source, make_file)
+        finally:
+            Interpreter.on_print = on_print
+        print(f'{name + ":":20} buffered {args.lines / buffered:10,.0f} lines/s, '
+              f'print per line {args.lines / unbuffered:10,.0f} lines/s')
+
+
+if __name__ == '__main__':
+    main()
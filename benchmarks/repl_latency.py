@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Measures per-line REPL latency after loading a prelude of the given size.
+
+Run with `python -m benchmarks.repl_latency [--functions N] [--lines N]`.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from lox.session import Session
+
+PRELUDE_ENTRY = '''
+class Shape{i} {{
+    init(size) {{ this.size = size; }}
+    area() {{ return this.size * {i}; }}
+}}
+fun helper{i}(x) {{
+    var shape = Shape{i}(x);
+    return shape.area() + x;
+}}
+'''
+
+LINES = [
+    'var x = {i};',
+    'print helper{i}(x);',
+    'print Shape{i}(2).area();',
+    'fun local{i}(y) {{ return y + x; }}',
+    'print local{i}(1);',
+]
+
+
+def measure(functions: int, lines: int):
+    session = Session()
+    prelude = ''.join(PRELUDE_ENTRY.format(i=i) for i in range(functions))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        session.run(prelude)
+        prelude_seconds = time.perf_counter() - start
+
+        latencies = []
+        for n in range(lines):
+            line = LINES[n % len(LINES)].format(i=n % functions)
+            start = time.perf_counter()
+            session.feed(line)
+            latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return prelude_seconds, statistics.mean(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=2000, help='classes and functions in the prelude')
+    arg_parser.add_argument('--lines', type=int, default=5000, help='REPL lines to time')
+    args = arg_parser.parse_args()
+
+    for functions in (10, args.functions):
+        prelude, mean, p95 = measure(functions, args.lines)
+        print(f'prelude of {functions:>5} classes/functions: loaded in {prelude * 1000:7.1f}ms, '
+              f'per line mean {mean * 1e6:6.1f}us, p95 {p95 * 1e6:6.1f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Builds a large string with `s = s + chunk;` in a Lox loop.
+
+Run with `python -m benchmarks.rope_concat [--megabytes N] [--compare]`.
+`--compare` also times the same loop with ropes disabled, which is quadratic,
+so keep the size small when using it.
+"""
+import argparse
+
+from lox import rope
+from benchmarks.common import run_lox
+
+CHUNK = 'x' * 100
+
+SOURCE = '''
+var chunk = "{chunk}";
+var s = "";
+for (var i = 0; i < {iterations}; i = i + 1) {{
+    s = s + chunk;
+}}
+print s == s + "";
+'''
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--megabytes', type=float, default=10)
+    arg_parser.add_argument('--compare', action='store_true', help='also run with ropes disabled')
+    args = arg_parser.parse_args()
+
+    iterations = int(args.megabytes * 1_000_000 // len(CHUNK))
+    source = SOURCE.format(chunk=CHUNK, iterations=iterations)
+
+    elapsed, _ = run_lox(source)
+    print(f'ropes:    {args.megabytes:g} MB in {elapsed:.2f}s')
+
+    if args.compare:
+        min_rope_length = rope.MIN_ROPE_LENGTH
+        rope.MIN_ROPE_LENGTH = float('inf')
+        try:
+            elapsed, _ = run_lox(source)
+        finally:
+            rope.MIN_ROPE_LENGTH = min_rope_length
+        print(f'no ropes: {args.megabytes:g} MB in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Compares running a prelude with restoring a snapshot of the interpreter it produced.
+
+Run with `python -m benchmarks.snapshot_startup [--functions N]`.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.repl_latency import PRELUDE_ENTRY
+from lox import snapshot
+from lox.lox import Lox
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=2000, help='classes and functions in the prelude')
+    args = arg_parser.parse_args()
+
+    prelude = ''.join(PRELUDE_ENTRY.format(i=i) for i in range(args.functions))
+
+    start = time.perf_counter()
+    lox = Lox()
+    lox.run(prelude)
+    run_seconds = time.perf_counter() - start
+
+    with tempfile.NamedTemporaryFile(suffix='.snap', delete=False) as file:
+        path = file.name
+    try:
+        snapshot.save(lox.interpreter, path)
+
+        start = time.perf_counter()
+        restored = Lox()
+        snapshot.restore(restored, path)
+        restore_seconds = time.perf_counter() - start
+        size = os.path.getsize(path)
+    finally:
+        os.unlink(path)
+
+    restored.run(f'print helper{args.functions - 1}(1);')
+    print(f'prelude of {args.functions} classes/functions ({len(prelude.splitlines())} lines)')
+    print(f'run prelude:      {run_seconds * 1000:8.1f}ms')
+    print(f'restore snapshot: {restore_seconds * 1000:8.1f}ms ({size / 1024:.0f} KiB)')
+
+
+if __name__ == '__main__':
+    main()
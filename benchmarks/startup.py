@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Checks that running a script stays cheap to start.
+
+Run with `python -m benchmarks.startup [--runs N] [--max-overhead-ms MS]`.
+Exits with status 1 if script mode imports a REPL-only or optional module,
+or if running a hello world script takes more than MAX_OVERHEAD_MS longer
+than starting a bare interpreter.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only the REPL or optional features need.
+FORBIDDEN_MODULES = ['readline', 'pathlib', 'typing', 'numpy', 'asyncio', 'multiprocessing', 'concurrent.futures']
+
+
+def best_of(runs: int, command):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(script: str):
+    result = subprocess.run([sys.executable, '-X', 'importtime', 'runner.py', script], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--runs', type=int, default=20)
+    arg_parser.add_argument('--max-overhead-ms', type=float, default=40.0)
+    args = arg_parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.lox', delete=False) as script:
+        script.write('print "Hello World!";\n')
+
+    try:
+        times = import_times(script.name)
+        bare = best_of(args.runs, [sys.executable, '-c', 'pass'])
+        hello = best_of(args.runs, [sys.executable, 'runner.py', script.name])
+    finally:
+        os.unlink(script.name)
+
+    print(f'import lox.repl: {times.get("lox.repl", 0) / 1000:.1f}ms')
+    print(f'python -c pass:  {bare * 1000:.1f}ms')
+    print(f'hello world:     {hello * 1000:.1f}ms (+{(hello - bare) * 1000:.1f}ms)')
+
+    failed = False
+    imported = [module for module in FORBIDDEN_MODULES if module in times]
+    if imported:
+        print(f'FAIL: script mode imports {", ".join(imported)}')
+        failed = True
+    if (hello - bare) * 1000 > args.max_overhead_ms:
+        print(f'FAIL: startup overhead is above {args.max_overhead_ms:g}ms')
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Compares the memory and speed of scanning and parsing through a list of Tokens and through a TokenStream.
+
+Run with `python -m benchmarks.token_stream [--statements N] [--repeat N]`.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.parser_throughput import source
+from lox.lox import Lox
+from lox.parser import Parser, StreamParser
+from lox.scanner import Scanner
+from lox.token_stream import CompactScanner
+
+KINDS = {
+    'list of Tokens': (Scanner, Parser),
+    'TokenStream': (CompactScanner, StreamParser),
+}
+
+
+def timings(code: str, scanner, parser) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    tokens = scanner(code, Lox()).scan_tokens()
+    scanned = time.perf_counter()
+    parser(tokens, Lox()).parse()
+    return scanned - start, time.perf_counter() - scanned, len(tokens)
+
+
+def memory(code: str, scanner, parser) -> tuple[int, int]:
+    # What the tokens hold on to, and the peak while the AST is built.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tokens = scanner(code, Lox()).scan_tokens()
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        parser(tokens, Lox()).parse()
+        return held, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--statements', type=int, default=10_000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code = source(args.statements)
+    print(f'{len(code) / 2 ** 20:.1f} MiB of source')
+    for name, (scanner, parser) in KINDS.items():
+        runs = [timings(code, scanner, parser) for _ in range(args.repeat)]
+        scan = min(run[0] for run in runs)
+        parse = min(run[1] for run in runs)
+        count = runs[0][2]
+        held, peak = memory(code, scanner, parser)
+        print(f'{name + ":":16} {count} tokens, {held / 2 ** 20:6.1f} MiB held, {peak / 2 ** 20:6.1f} MiB peak; '
+              f'scan {scan:.2f}s, parse {parse:.2f}s ({count / (scan + parse) / 1000:.0f}k tokens/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from lox.budget import Limits
+from lox.callable import AsyncNative
+from lox.environment import Environment
+from lox.interpreter import Interpreter
+from lox.lox import RuntimeErrorReporter
+from lox.program import Program
+
+# Steps (loop iterations and calls) a program runs before letting others run.
+DEFAULT_YIELD_EVERY = 1000
+
+
+async def sleep(seconds):
+    await asyncio.sleep(seconds)
+
+
+async def wait_for_future(future, timeout: float | None):
+    return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+
+# The interpreter is recursive, so a suspended program needs a stack of its
+# own: each program runs on a parked thread. Only the thread holding the
+# baton runs Lox code, and it only lets go at a checkpoint or while waiting
+# for an async native, so programs take turns as asyncio tasks would.
+class Scheduler:
+    def __init__(self, loop: asyncio.AbstractEventLoop, baton: threading.Lock, yield_every: int):
+        self.loop = loop
+        self.baton = baton
+        self.yield_every = yield_every
+        self.countdown = yield_every
+        self.cancelled = False
+
+    def checkpoint(self):
+        self.countdown -= 1
+        if self.countdown == 0:
+            self.countdown = self.yield_every
+            self.wait_for(asyncio.sleep(0))
+
+    def wait_for_future(self, future, timeout: float | None = None):
+        # A concurrent.futures.Future, like a spawned call's. Timing out
+        # raises the same error as Future.result does.
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        try:
+            return self.wait_for(wait_for_future(future, timeout))
+        except asyncio.TimeoutError:
+            raise FutureTimeoutError()
+
+    def wait_for(self, coroutine):
+        self.baton.release()
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+        finally:
+            self.baton.acquire()
+            if self.cancelled:
+                raise asyncio.CancelledError()
+
+
+class AsyncLox:
+    def __init__(self, yield_every: int = DEFAULT_YIELD_EVERY):
+        self.yield_every = yield_every
+        self.baton = threading.Lock()
+
+    @staticmethod
+    def create_globals() -> Environment:
+        globals = Interpreter.create_globals()
+        globals.define('sleep', AsyncNative('sleep', 1, sleep))
+        return globals
+
+    async def execute(self, program: Program, globals: Environment | None = None,
+                      limits: Limits | None = None) -> bool:
+        # Returns whether the program finished without a runtime error.
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        reporter = RuntimeErrorReporter()
+        scheduler = Scheduler(loop, self.baton, self.yield_every)
+        globals = globals if globals is not None else AsyncLox.create_globals()
+        interpreter = Interpreter(reporter, globals, program.locals, limits, scheduler)
+
+        def settle(error):
+            if not finished.done():
+                if error is None:
+                    finished.set_result(not reporter.had_runtime_error)
+                else:
+                    finished.set_exception(error)
+
+        def run():
+            error = None
+            with self.baton:
+                try:
+                    interpreter.interpret(program)
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    error = e
+            loop.call_soon_threadsafe(settle, error)
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            return await finished
+        except asyncio.CancelledError:
+            scheduler.cancelled = True
+            raise
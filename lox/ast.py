@@ -1,5 +1,6 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional
 from lox.token import Token
 
 
@@ -60,7 +61,7 @@ class Expr(ABC):
 
 
 class Literal(Expr):
-    def __init__(self, value: Any):
+    def __init__(self, value: object):
         self.value = value
 
     def perform_operation(self, operation: ExprOperation):
@@ -95,17 +96,21 @@ class Grouping(Expr):
 
 
 class Variable(Expr):
-    def __init__(self, name: Token):
+    def __init__(self, name: Token, version: object = None, slot: int = 0):
         self.name = name
+        self.version = version
+        self.slot = slot
 
     def perform_operation(self, operation: ExprOperation):
         return operation.on_variable(self)
 
 
 class Assign(Expr):
-    def __init__(self, identifier: Token, value: Expr):
+    def __init__(self, identifier: Token, value: Expr, version: object = None, slot: int = 0):
         self.identifier = identifier
         self.value = value
+        self.version = version
+        self.slot = slot
 
     def perform_operation(self, operation: ExprOperation):
         return operation.on_assign(self)
@@ -122,7 +127,7 @@ class Logical(Expr):
 
 
 class Call(Expr):
-    def __init__(self, callee: Expr, paren: Token, args: List[Expr]):
+    def __init__(self, callee: Expr, paren: Token, args: list[Expr]):
         self.callee = callee
         self.paren = paren
         self.args = args
@@ -196,6 +201,10 @@ class StmtOperation(ABC):
    def on_while_loop(self, whileloop: 'WhileLoop'):
        pass
 
+   @abstractmethod
+   def on_for_loop(self, forloop: 'ForLoop'):
+       pass
+
    @abstractmethod
    def on_return_stmt(self, returnstmt: 'ReturnStmt'):
        pass
@@ -204,6 +213,10 @@ class StmtOperation(ABC):
    def on_class_decl(self, classdecl: 'ClassDecl'):
        pass
 
+   @abstractmethod
+   def on_import_stmt(self, importstmt: 'ImportStmt'):
+       pass
+
 
 class Stmt(ABC):
     @abstractmethod
@@ -228,7 +241,7 @@ class Print(Stmt):
 
 
 class Var(Stmt):
-    def __init__(self, name: Token, initializer: Optional[Expr]):
+    def __init__(self, name: Token, initializer: Expr | None):
         self.name = name
         self.initializer = initializer
 
@@ -237,7 +250,7 @@ class Var(Stmt):
 
 
 class Block(Stmt):
-    def __init__(self, statements: List[Stmt]):
+    def __init__(self, statements: list[Stmt]):
         self.statements = statements
 
     def perform_operation(self, operation: StmtOperation):
@@ -245,7 +258,7 @@ class Block(Stmt):
 
 
 class Function(Stmt):
-    def __init__(self, name: Token, params: List[Token], body: Block):
+    def __init__(self, name: Token, params: list[Token], body: Block):
         self.name = name
         self.params = params
         self.body = body
@@ -265,7 +278,8 @@ class IfElse(Stmt):
 
 
 class WhileLoop(Stmt):
-    def __init__(self, condition: Expr, body: Stmt):
+    def __init__(self, keyword: Token, condition: Expr, body: Stmt):
+        self.keyword = keyword
         self.condition = condition
         self.body = body
 
@@ -273,8 +287,20 @@ class WhileLoop(Stmt):
         return operation.on_while_loop(self)
 
 
+class ForLoop(Stmt):
+    def __init__(self, keyword: Token, initializer: Stmt | None, condition: Expr, increment: Expr | None, body: Stmt):
+        self.keyword = keyword
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+
+    def perform_operation(self, operation: StmtOperation):
+        return operation.on_for_loop(self)
+
+
 class ReturnStmt(Stmt):
-    def __init__(self, keyword: Token, value: Optional[Expr]):
+    def __init__(self, keyword: Token, value: Expr | None):
         self.keyword = keyword
         self.value = value
 
@@ -283,7 +309,7 @@ class ReturnStmt(Stmt):
 
 
 class ClassDecl(Stmt):
-    def __init__(self, name: Token, superclass: Optional[Variable], methods: List[Function]):
+    def __init__(self, name: Token, superclass: Variable | None, methods: list[Function]):
         self.name = name
         self.superclass = superclass
         self.methods = methods
@@ -292,3 +318,12 @@ class ClassDecl(Stmt):
         return operation.on_class_decl(self)
 
 
+class ImportStmt(Stmt):
+    def __init__(self, keyword: Token, path: Token):
+        self.keyword = keyword
+        self.path = path
+
+    def perform_operation(self, operation: StmtOperation):
+        return operation.on_import_stmt(self)
+
+
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+import argparse
+import contextlib
+import functools
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from .budget import Limits
+from .lox import Lox
+
+# Exit statuses follow the sysexits.h codes used by the book's jlox.
+EX_OK = 0
+EX_DATAERR = 65
+EX_NOINPUT = 66
+EX_SOFTWARE = 70
+
+
+# Each worker imports the interpreter once and then runs every script it is
+# handed on a fresh `Lox` instance, so a batch pays Python startup per worker
+# instead of per script.
+def run_script(path: str, limits: Limits = None):
+    output = io.StringIO()
+    start = time.perf_counter()
+
+    try:
+        with open(path, 'r') as file:
+            code = file.read()
+    except OSError as e:
+        return {'path': path, 'status': EX_NOINPUT, 'seconds': 0.0, 'output': f'{e}\n'}
+
+    lox = Lox(limits)
+    lox.interpreter.directory = os.path.dirname(path)
+    with contextlib.redirect_stdout(output):
+        try:
+            lox.run(code)
+        except Exception as e:
+            print(f'Internal error: {repr(e)}')
+            lox.had_runtime_error = True
+
+    if lox.had_error:
+        status = EX_DATAERR
+    elif lox.had_runtime_error:
+        status = EX_SOFTWARE
+    else:
+        status = EX_OK
+
+    return {'path': path, 'status': status, 'seconds': time.perf_counter() - start, 'output': output.getvalue()}
+
+
+def expand_scripts(patterns):
+    scripts = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                scripts.append(path)
+    return scripts
+
+
+def run_batch(scripts, jobs=None, limits: Limits = None):
+    # Scripts are handed out in small chunks so long-running scripts do not
+    # leave other workers idle at the end of a batch.
+    jobs = jobs or os.cpu_count()
+    chunksize = max(1, min(16, len(scripts) // (jobs * 8)))
+    with multiprocessing.Pool(processes=jobs) as pool:
+        return list(pool.imap(functools.partial(run_script, limits=limits), scripts, chunksize))
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(prog='python -m lox.batch', description='Run many Lox scripts in parallel.')
+    arg_parser.add_argument('scripts', nargs='+', help='script paths or glob patterns')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes')
+    arg_parser.add_argument('--summary', help='write per-script status and output to this JSON file')
+    arg_parser.add_argument('--max-steps', type=int, help='stop a script after this many loop iterations and calls')
+    arg_parser.add_argument('--max-seconds', type=float, help='stop a script after this much wall-clock time')
+    arg_parser.add_argument('--max-allocations', type=int, help='stop a script after it allocates this many '
+                                                                'call frames and instances')
+    args = arg_parser.parse_args(argv)
+
+    limits = Limits(args.max_steps, args.max_seconds, args.max_allocations)
+    scripts = expand_scripts(args.scripts)
+    start = time.perf_counter()
+    results = run_batch(scripts, args.jobs, limits)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if result['status'] != EX_OK:
+            failed += 1
+        print(f'{result["status"]:>3} {result["seconds"]:8.3f}s {result["path"]}')
+    print(f'{len(results)} scripts, {failed} failed, {elapsed:.3f}s')
+
+    if args.summary:
+        with open(args.summary, 'w') as summary:
+            json.dump(results, summary, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
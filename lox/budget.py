@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import time
+
+from lox.token import Token
+from lox.util import BudgetKind, LoxBudgetError
+
+# The clock is only read every this many steps.
+TIME_CHECK_INTERVAL = 256
+
+
+class Limits:
+    def __init__(self, max_steps: int | None = None, max_seconds: float | None = None,
+                 max_allocations: int | None = None):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_allocations = max_allocations
+
+
+# Tracks one run against its Limits. A step is a loop iteration or a call;
+# allocations (call frames and instances) are only counted as they happen
+# and compared against the limit at the next step.
+class Budget:
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.steps = 0
+        self.allocations = 0
+        self.max_steps = limits.max_steps if limits.max_steps is not None else float('inf')
+        self.max_allocations = limits.max_allocations if limits.max_allocations is not None else float('inf')
+        self.deadline = time.monotonic() + limits.max_seconds if limits.max_seconds is not None else None
+
+    def step(self, token: Token):
+        self.steps += 1
+        if self.steps > self.max_steps:
+            raise LoxBudgetError(token, BudgetKind.STEPS, self.limits.max_steps)
+
+        if self.allocations > self.max_allocations:
+            raise LoxBudgetError(token, BudgetKind.ALLOCATIONS, self.limits.max_allocations)
+
+        if self.deadline is not None and self.steps % TIME_CHECK_INTERVAL == 0 and time.monotonic() > self.deadline:
+            raise LoxBudgetError(token, BudgetKind.TIME, f'{self.limits.max_seconds:g}s')
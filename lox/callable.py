@@ -1,15 +1,21 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 import time
-from typing import List, Any
 
 from lox.ast import Function
-from lox.environment import Environment
-from lox.util import ReturnValue
+from lox.environment import Cell
+from lox.layout import FunctionLayout
+from lox.rope import LoxRope
+from lox.util import LoxRuntimeError, ReturnValue
+
+# Arity reported by natives that accept any number of arguments.
+VARIADIC = -1
 
 
 class Callable(ABC):
     @abstractmethod
-    def call(self, interpreter, args: List[Any]):
+    def call(self, interpreter, args: list[object]):
         pass
 
     @abstractmethod
@@ -18,7 +24,7 @@ class Callable(ABC):
 
 
 class Clock(Callable):
-    def call(self, interpreter, args: List[Any]):
+    def call(self, interpreter, args: list[object]):
         return float(time.time())
 
     def arity(self) -> int:
@@ -28,33 +34,83 @@ class Clock(Callable):
         return '<native_fn>'
 
 
+def to_number(val):
+    if isinstance(val, float):
+        return val
+    if isinstance(val, (str, LoxRope)):
+        try:
+            return float(str(val))
+        except ValueError:
+            pass
+    raise LoxRuntimeError(None, f'Cannot convert \'{val}\' to a number.')
+
+
+class NativeFunction(Callable):
+    def __init__(self, name: str, arity: int, function):
+        self.name = name
+        self._arity = arity
+        self.function = function
+
+    def call(self, interpreter, args: list[object]):
+        return self.function(*args)
+
+    def arity(self) -> int:
+        return self._arity
+
+    def __str__(self):
+        return f'<native_fn {self.name}>'
+
+
+class AsyncNative(NativeFunction):
+    # Wraps an `async def` function. Under an async scheduler only the calling
+    # program waits for it; otherwise it is run to completion on the spot.
+    def call(self, interpreter, args: list[object]):
+        if interpreter.scheduler is not None:
+            return interpreter.scheduler.wait_for(self.function(*args))
+
+        import asyncio
+        return asyncio.run(self.function(*args))
+
+
 class LoxCallable(Callable):
-    def __init__(self, declaration: Function, environment: Environment, is_initializer: bool = False):
+    # Holds only the cells of the variables its body captures, rather than
+    # the whole scope it was declared in.
+    def __init__(self, declaration: Function, layout: FunctionLayout, upvalues: list[Cell],
+                 is_initializer: bool = False, this=None):
         self.declaration = declaration
-        self.environment = environment
+        self.layout = layout
+        self.upvalues = upvalues
         self.is_initializer = is_initializer
-
-    def call(self, interpreter, args: List[Any]):
-        environment = Environment(self.environment)
-
-        for token, expression in zip(self.declaration.params, args):
-            environment.define(token.lexeme, expression)
+        self.this = this
+
+    def call(self, interpreter, args: list[object]):
+        layout = self.layout
+        if layout.has_this:
+            frame = [self.this, *args]
+        else:
+            frame = list(args)
+        frame.extend([None] * (layout.frame_size - len(frame)))
+        for slot in layout.cells:
+            frame[slot] = Cell(frame[slot])
+        if interpreter.budget is not None:
+            interpreter.budget.allocations += 1
+        if interpreter.stats is not None:
+            interpreter.stats.frames += 1
+            interpreter.stats.cells += len(layout.cells)
 
         try:
-            interpreter.execute_block(self.declaration.body, environment)
+            interpreter.execute_function(self.declaration.body.statements, frame, self.upvalues)
         except ReturnValue as return_val:
             if self.is_initializer:
-                return self.environment.get_at(0, 'this')
+                return self.this
             else:
                 return return_val.val
 
         if self.is_initializer:
-            return self.environment.get_at(0, 'this')
+            return self.this
 
     def bind(self, instance):
-        env = Environment(self.environment)
-        env.define('this', instance)
-        return LoxCallable(self.declaration, env)
+        return LoxCallable(self.declaration, self.layout, self.upvalues, this=instance)
 
     def arity(self) -> int:
         return len(self.declaration.params)
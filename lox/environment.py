@@ -1,46 +1,54 @@
 from lox.token import Token
-import lox.interpreter
 from lox.util import LoxRuntimeError
 
 
+# Holds the globals. Locals live in frames, see lox/layout.py.
+#
+# Each global keeps its slot in `values` for good. Variable and Assign nodes
+# cache the slot of their global together with the table's `version`, which
+# is replaced whenever a new global is defined, so a hot global read is a
+# version check and an index. Versions are identity tokens rather than
+# numbers, so a node never matches another table's version, not even after
+# it has been pickled along to another process.
 class Environment:
-    def __init__(self, enclosing = None):
-        self.values = {}
-        self.enclosing = enclosing
+    def __init__(self):
+        self.slots: dict[str, int] = {}
+        self.values: list[object] = []
+        self.version = object()
 
     def define(self, name: str, value):
-        self.values[name] = value
+        slot = self.slots.get(name)
+        if slot is None:
+            self.slots[name] = len(self.values)
+            self.values.append(value)
+            self.version = object()
+        else:
+            self.values[slot] = value
 
     def assign(self, token: Token, value):
         name = token.lexeme
-        if name in self.values:
-            self.values[name] = value
-        elif self.enclosing is not None:
-            self.enclosing.assign(token, value)
+        if name in self.slots:
+            self.values[self.slots[name]] = value
         else:
             raise LoxRuntimeError(token, f'Undefined variable {name}.')
 
-    def assign_at(self, depth: int, token: Token, value):
-        self.ancestor(depth).assign(token, value)
-
     def get(self, token: Token):
         name = token.lexeme
-        if name in self.values:
-            return self.values[name]
-        elif self.enclosing is not None:
-            return self.enclosing.get(token)
+        if name in self.slots:
+            return self.values[self.slots[name]]
         else:
             raise LoxRuntimeError(token, f'Undefined variable \'{name}\'.')
 
-    def get_at(self, depth, name: str):
-        env = self.ancestor(depth).values
-        if name in env:
-            return env[name]
+    def lookup(self, name: str, default=None):
+        slot = self.slots.get(name)
+        return self.values[slot] if slot is not None else default
 
-    def ancestor(self, depth):
-        curr = self
-        for _ in range(depth):
-            curr = curr.enclosing
-        return curr
+    def items(self):
+        values = self.values
+        return ((name, values[slot]) for name, slot in self.slots.items())
 
 
+# A local that outlives its frame because a closure captured it.
+class Cell:
+    def __init__(self, value=None):
+        self.value = value
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from lox.callable import NativeFunction
+from lox.rope import LoxRope
+from lox.util import LoxRuntimeError
+
+# Bytes buffered by files opened for writing before they go to the OS.
+WRITE_BUFFER_SIZE = 64 * 1024
+
+MODES = ('r', 'w', 'a')
+
+
+# An open file. Lines and chunks are read on demand through the file's own
+# buffer, so a script can walk through a file of any size in constant memory.
+# Lines come without their line ending, chunks exactly as they are in the
+# file, and reads past the end give nil.
+class LoxFile:
+    def __init__(self, path: str, file):
+        self.path = path
+        self.file = file
+
+    def read_line(self) -> str | None:
+        line = self.file.readline()
+        if not line:
+            return None
+        return line.rstrip('\r\n')
+
+    def read_chunk(self, size: int) -> str | None:
+        return self.file.read(size) or None
+
+    def write(self, text: str):
+        self.file.write(text)
+
+    def close(self):
+        self.file.close()
+
+    def __str__(self):
+        return f'<file {self.path}>'
+
+
+# A file read through a memory map, which leaves buffering to the OS page
+# cache. Read only; the text is decoded as UTF-8. Chunks are counted in
+# characters, like those of any other file, so a chunk read decodes what it
+# needs and keeps the rest, including the first bytes of a character split
+# across the read, for the reads after it.
+class MappedFile(LoxFile):
+    def __init__(self, path: str, file, data):
+        import codecs
+
+        super().__init__(path, file)
+        self.data = data
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.pending = ''
+        # Whether the decoder holds the first bytes of a character.
+        self.split = False
+
+    def read_line(self) -> str | None:
+        if self.pending or self.split:
+            return self.read_decoded_line()
+        line = self.data.readline()
+        if not line:
+            return None
+        return line.rstrip(b'\r\n').decode()
+
+    def read_decoded_line(self) -> str | None:
+        # The rest of a line a chunk read started.
+        end = self.pending.find('\n') + 1
+        if end == 0:
+            data = self.data.readline()
+            self.pending += self.decoder.decode(data, final=not data.endswith(b'\n'))
+            self.split = False
+            end = len(self.pending)
+        line, self.pending = self.pending[:end], self.pending[end:]
+        return line.rstrip('\r\n') if line else None
+
+    def read_chunk(self, size: int) -> str | None:
+        # Every byte gives at most one character, so read no more than the
+        # characters still missing.
+        while len(self.pending) < size:
+            data = self.data.read(size - len(self.pending))
+            self.pending += self.decoder.decode(data, final=not data)
+            if not data:
+                break
+        self.split = bool(self.decoder.getstate()[0])
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk or None
+
+    def write(self, text: str):
+        raise LoxRuntimeError(None, f'File \'{self.path}\' is mapped for reading.')
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def string_arg(val: object, what: str) -> str:
+    if isinstance(val, LoxRope):
+        return str(val)
+    if not isinstance(val, str):
+        raise LoxRuntimeError(None, f'Expected {what} string.')
+    return val
+
+
+def file_arg(val: object) -> LoxFile:
+    if not isinstance(val, LoxFile):
+        raise LoxRuntimeError(None, 'Expected file argument.')
+    return val
+
+
+def open_file(path, mode):
+    path = string_arg(path, 'file path')
+    mode = string_arg(mode, 'file mode')
+    if mode not in MODES:
+        raise LoxRuntimeError(None, f'File mode must be one of {", ".join(MODES)}.')
+    try:
+        if mode == 'r':
+            return LoxFile(path, open(path, 'r', encoding='utf-8', newline=''))
+        return LoxFile(path, open(path, mode, encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE))
+    except OSError as e:
+        raise LoxRuntimeError(None, f'Cannot open \'{path}\': {e.strerror}.')
+
+
+def map_file(path):
+    import mmap
+
+    path = string_arg(path, 'file path')
+    try:
+        file = open(path, 'rb')
+    except OSError as e:
+        raise LoxRuntimeError(None, f'Cannot open \'{path}\': {e.strerror}.')
+    try:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty files can't be mapped, but then there is nothing to read.
+        import io
+        data = io.BytesIO()
+    except OSError as e:
+        file.close()
+        raise LoxRuntimeError(None, f'Cannot map \'{path}\': {e.strerror}.')
+    return MappedFile(path, file, data)
+
+
+# Reading from or writing to a closed file, or writing to one opened for
+# reading, fails in the file itself.
+def file_error(file: LoxFile, e: Exception) -> LoxRuntimeError:
+    return LoxRuntimeError(None, f'Cannot access \'{file.path}\': {str(e).rstrip(".")}.')
+
+
+def read_line(file):
+    file = file_arg(file)
+    try:
+        return file.read_line()
+    except (OSError, ValueError) as e:
+        raise file_error(file, e)
+
+
+def read_chunk(file, size):
+    file = file_arg(file)
+    if not isinstance(size, float) or not size.is_integer() or size < 1:
+        raise LoxRuntimeError(None, 'Chunk size must be a positive whole number.')
+    try:
+        return file.read_chunk(int(size))
+    except (OSError, ValueError) as e:
+        raise file_error(file, e)
+
+
+def write(file, text):
+    file = file_arg(file)
+    text = string_arg(text, 'text')
+    try:
+        file.write(text)
+    except (OSError, ValueError) as e:
+        raise file_error(file, e)
+
+
+def write_line(file, text):
+    write(file, string_arg(text, 'text') + '\n')
+
+
+def close(file):
+    file = file_arg(file)
+    try:
+        file.close()
+    except OSError as e:
+        raise file_error(file, e)
+
+
+def define_natives(environment):
+    natives = [
+        NativeFunction('openFile', 2, open_file),
+        NativeFunction('mapFile', 1, map_file),
+        NativeFunction('readLine', 1, read_line),
+        NativeFunction('readChunk', 2, read_chunk),
+        NativeFunction('write', 2, write),
+        NativeFunction('writeLine', 2, write_line),
+        NativeFunction('close', 1, close),
+    ]
+    for native in natives:
+        environment.define(native.name, native)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from lox import util
+from lox.callable import NativeFunction, VARIADIC
+from lox.rope import LoxRope
+from lox.util import LoxRuntimeError
+
+
+# Booleans are kept apart from numbers as keys: Python's True == 1.0, but a
+# map has to tell `true` and 1 apart.
+class BoolKey:
+    def __init__(self, value: bool):
+        self.value = value
+
+    def __reduce__(self):
+        return bool_key, (self.value,)
+
+
+TRUE_KEY = BoolKey(True)
+FALSE_KEY = BoolKey(False)
+
+
+def bool_key(value: bool) -> BoolKey:
+    return TRUE_KEY if value else FALSE_KEY
+
+
+def to_key(val: object):
+    if isinstance(val, bool):
+        return TRUE_KEY if val else FALSE_KEY
+    if isinstance(val, (float, str)) or val is None:
+        return val
+    if isinstance(val, LoxRope):
+        return str(val)
+    raise LoxRuntimeError(None, 'Map keys must be numbers, strings, booleans or nil.')
+
+
+def from_key(key: object):
+    return key.value if isinstance(key, BoolKey) else key
+
+
+def entry_string(val: object) -> str:
+    if isinstance(val, (str, LoxRope)):
+        return f'"{val}"'
+    return str(util.stringified(val))
+
+
+# A map from numbers, strings, booleans and nil to any value, backed by a
+# dict. Maps are equal when they hold equal entries, like vectors.
+class LoxMap:
+    def __init__(self, entries: dict[object, object] | None = None):
+        self.entries = entries if entries is not None else {}
+
+    def __str__(self):
+        items = ', '.join(f'{entry_string(from_key(key))}: {entry_string(val)}' for key, val in self.entries.items())
+        return f'{{{items}}}'
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __eq__(self, other):
+        return isinstance(other, LoxMap) and self.entries == other.entries
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+def map_arg(val: object) -> LoxMap:
+    if not isinstance(val, LoxMap):
+        raise LoxRuntimeError(None, 'Expected map argument.')
+    return val
+
+
+def hash_map(*args):
+    if len(args) % 2 != 0:
+        raise LoxRuntimeError(None, 'Expected alternating keys and values.')
+    return LoxMap({to_key(args[i]): args[i + 1] for i in range(0, len(args), 2)})
+
+
+def get(map, key):
+    return map_arg(map).entries.get(to_key(key))
+
+
+def set_(map, key, val):
+    map_arg(map).entries[to_key(key)] = val
+
+
+def has(map, key):
+    return to_key(key) in map_arg(map).entries
+
+
+def delete(map, key):
+    # Whether there was an entry to delete.
+    entries = map_arg(map).entries
+    key = to_key(key)
+    if key in entries:
+        del entries[key]
+        return True
+    return False
+
+
+def keys(map):
+    # Lox has no lists, so the keys come as a map from their index, in
+    # insertion order.
+    return LoxMap({float(i): from_key(key) for i, key in enumerate(map_arg(map).entries)})
+
+
+def size(map):
+    return float(len(map_arg(map)))
+
+
+def define_natives(environment):
+    natives = [
+        NativeFunction('hashMap', VARIADIC, hash_map),
+        NativeFunction('get', 2, get),
+        NativeFunction('set', 3, set_),
+        NativeFunction('has', 2, has),
+        NativeFunction('delete', 2, delete),
+        NativeFunction('keys', 1, keys),
+        NativeFunction('size', 1, size),
+    ]
+    for native in natives:
+        environment.define(native.name, native)
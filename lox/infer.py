@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import sys
+from enum import Enum
+
+from lox import specialize
+from lox.ast import StmtOperation, ExprOperation, Block, Stmt, Var, Expr, Variable, Assign, Function, Unary, Binary, \
+    Grouping, Logical, Literal, Expression, Print, IfElse, WhileLoop, ForLoop, ReturnStmt, Call, ClassDecl, Get, \
+    SetProp, ThisExpr, SuperExpr, ImportStmt
+from lox.layout import Access, LOCAL
+from lox.token_type import TokenType as TT
+
+
+class StaticType(Enum):
+    NUMBER = 'number'
+    STRING = 'string'
+    BOOLEAN = 'boolean'
+    NIL = 'nil'
+    UNKNOWN = 'unknown'
+
+
+# Operators whose operands the interpreter checks at runtime.
+CHECKED_OPERATORS = {TT.PLUS, TT.MINUS, TT.STAR, TT.SLASH, TT.GREATER, TT.GREATER_EQUAL, TT.LESS, TT.LESS_EQUAL}
+
+
+def join(lhs: StaticType, rhs: StaticType) -> StaticType:
+    return lhs if lhs is rhs else StaticType.UNKNOWN
+
+
+def join_states(lhs: dict[Access, StaticType], rhs: dict[Access, StaticType]) -> dict[Access, StaticType]:
+    # Variables missing on either side have gone out of scope.
+    return {access: join(kind, rhs[access]) for access, kind in lhs.items() if access in rhs}
+
+
+def type_of(value) -> StaticType:
+    if isinstance(value, bool):
+        return StaticType.BOOLEAN
+    if isinstance(value, float):
+        return StaticType.NUMBER
+    if isinstance(value, str):
+        return StaticType.STRING
+    if value is None:
+        return StaticType.NIL
+    return StaticType.UNKNOWN
+
+
+class Inference:
+    def __init__(self, node: Binary | Unary, operands: tuple[StaticType, ...], proven: bool):
+        self.node = node
+        self.operands = operands
+        self.proven = proven
+
+    def __str__(self):
+        operator = self.node.operator
+        operands = ', '.join(operand.value for operand in self.operands)
+        return f'[line: {operator.line}] \'{operator.lexeme}\' {operands}: {"proven" if self.proven else "dynamic"}'
+
+
+# Works out, flow-sensitively, the types of the values of a resolved script's
+# expressions and switches every Binary and Unary node whose operand types it
+# proves to an unchecked class from lox.specialize. Only locals that no
+# closure captures are tracked, since nothing but their own function's code
+# can change them. Captured locals, globals, parameters, fields and call
+# results are unknown. Branches are joined, and loops are analysed until the
+# types at their start stop changing.
+class TypeInference(ExprOperation, StmtOperation):
+    def __init__(self, locals: dict[object, object]):
+        self.locals = locals
+        self.state: dict[Access, StaticType] = {}
+        # Operand types of each checked operation, from the last (and so
+        # loop-stable) time it was analysed.
+        self.operands: dict[Binary | Unary, tuple[StaticType, ...]] = {}
+
+    def infer(self, statements: list[Stmt]) -> list[Inference]:
+        self.analyze_stmts(statements)
+
+        inferences = []
+        for node, operands in self.operands.items():
+            if isinstance(node, Binary):
+                specialized = TypeInference.binary_specialization(node, *operands)
+            else:
+                specialized = specialize.NumberNegate if operands[0] is StaticType.NUMBER else None
+
+            if specialized is not None and node.__class__ in (Binary, Unary):
+                node.__class__ = specialized
+            inferences.append(Inference(node, operands, specialized is not None))
+
+        inferences.sort(key=lambda inference: inference.node.operator.line)
+        return inferences
+
+    @staticmethod
+    def binary_specialization(binary: Binary, lhs: StaticType, rhs: StaticType) -> type[Binary] | None:
+        if lhs is StaticType.NUMBER and rhs is StaticType.NUMBER:
+            return specialize.NUMBER_OPERATIONS[binary.operator.type]
+        if binary.operator.type == TT.PLUS and lhs is StaticType.STRING and rhs is StaticType.STRING:
+            return specialize.StringConcat
+        return None
+
+    def analyze_stmts(self, statements: list[Stmt]):
+        for statement in statements:
+            statement.perform_operation(self)
+
+    def analyze(self, expr: Expr) -> StaticType:
+        return expr.perform_operation(self)
+
+    def analyze_function(self, function: Function):
+        state = self.state
+        self.state = {}
+        self.analyze_stmts(function.body.statements)
+        self.state = state
+
+    def analyze_loop(self, condition: Expr, body: Stmt, increment: Expr | None = None):
+        while True:
+            entry = self.state
+            self.state = dict(entry)
+            self.analyze(condition)
+            exit = dict(self.state)
+
+            body.perform_operation(self)
+            if increment is not None:
+                self.analyze(increment)
+
+            merged = join_states(entry, self.state)
+            if merged == entry:
+                self.state = exit
+                return
+            self.state = merged
+
+    def read(self, expr: Expr) -> StaticType:
+        access = self.locals.get(expr)
+        if access is None or access.kind != LOCAL:
+            return StaticType.UNKNOWN
+        return self.state.get(access, StaticType.UNKNOWN)
+
+    def write(self, target: Access | None, kind: StaticType):
+        if target is not None and target.kind == LOCAL:
+            self.state[target] = kind
+
+    def on_literal(self, literal: Literal):
+        return type_of(literal.value)
+
+    def on_unary(self, unary: Unary):
+        operand = self.analyze(unary.expr)
+        if unary.operator.type == TT.MINUS:
+            self.operands[unary] = (operand,)
+            return StaticType.NUMBER
+        return StaticType.BOOLEAN
+
+    def on_binary(self, binary: Binary):
+        lhs = self.analyze(binary.left)
+        rhs = self.analyze(binary.right)
+        operator = binary.operator.type
+        if operator in CHECKED_OPERATORS:
+            self.operands[binary] = (lhs, rhs)
+
+        if operator in (TT.MINUS, TT.STAR, TT.SLASH, TT.PLUS):
+            # Anything else that gets past the checks is a vector, or a
+            # string for '+'.
+            if lhs is StaticType.NUMBER and rhs is StaticType.NUMBER:
+                return StaticType.NUMBER
+            if operator == TT.PLUS and lhs is StaticType.STRING and rhs is StaticType.STRING:
+                return StaticType.STRING
+            return StaticType.UNKNOWN
+        return StaticType.BOOLEAN
+
+    def on_grouping(self, grouping: Grouping):
+        return self.analyze(grouping.expr)
+
+    def on_variable(self, variable: Variable):
+        return self.read(variable)
+
+    def on_assign(self, assign: Assign):
+        self.write(self.locals.get(assign), self.analyze(assign.value))
+        # Assignments evaluate to nil.
+        return StaticType.NIL
+
+    def on_logical(self, logical: Logical):
+        lhs = self.analyze(logical.left)
+        skipped = dict(self.state)
+        rhs = self.analyze(logical.right)
+        self.state = join_states(skipped, self.state)
+        return join(lhs, rhs)
+
+    def on_call(self, call: Call):
+        self.analyze(call.callee)
+        for arg in call.args:
+            self.analyze(arg)
+        return StaticType.UNKNOWN
+
+    def on_get(self, get: Get):
+        self.analyze(get.expr)
+        return StaticType.UNKNOWN
+
+    def on_set_prop(self, setprop: SetProp):
+        self.analyze(setprop.expr)
+        return self.analyze(setprop.value)
+
+    def on_this_expr(self, thisexpr: ThisExpr):
+        return StaticType.UNKNOWN
+
+    def on_super_expr(self, superexpr: SuperExpr):
+        return StaticType.UNKNOWN
+
+    def on_expression(self, expression: Expression):
+        self.analyze(expression.expr)
+
+    def on_print(self, print: Print):
+        self.analyze(print.expr)
+
+    def on_var(self, var: Var):
+        kind = self.analyze(var.initializer) if var.initializer is not None else StaticType.NIL
+        self.write(self.locals.get(var), kind)
+
+    def on_block(self, block: Block):
+        self.analyze_stmts(block.statements)
+
+    def on_function(self, function: Function):
+        self.analyze_function(function)
+
+    def on_class_decl(self, classdecl: ClassDecl):
+        if classdecl.superclass is not None:
+            self.analyze(classdecl.superclass)
+        for method in classdecl.methods:
+            self.analyze_function(method)
+
+    def on_if_else(self, ifelse: IfElse):
+        self.analyze(ifelse.condition)
+        state = dict(self.state)
+        ifelse.then_statement.perform_operation(self)
+        then_state = self.state
+        self.state = state
+        ifelse.else_statement.perform_operation(self)
+        self.state = join_states(then_state, self.state)
+
+    def on_while_loop(self, whileloop: WhileLoop):
+        self.analyze_loop(whileloop.condition, whileloop.body)
+
+    def on_for_loop(self, forloop: ForLoop):
+        if forloop.initializer is not None:
+            forloop.initializer.perform_operation(self)
+        self.analyze_loop(forloop.condition, forloop.body, forloop.increment)
+
+    def on_return_stmt(self, returnstmt: ReturnStmt):
+        if returnstmt.value is not None:
+            self.analyze(returnstmt.value)
+
+    def on_import_stmt(self, importstmt: ImportStmt):
+        pass
+
+
+def main(argv):
+    from lox.lox import Lox
+    from lox.parser import Parser
+    from lox.resolver import Resolver
+    from lox.scanner import Scanner
+
+    if len(argv) != 1:
+        print('Usage: python -m lox.infer <script>')
+        return 64
+
+    with open(argv[0], 'r') as file:
+        code = file.read()
+
+    lox = Lox()
+    statements = Parser(Scanner(code, lox).scan_tokens(), lox).parse()
+    locals = {}
+    if statements is not None:
+        Resolver(lox, locals).resolve_script(statements)
+    if statements is None or lox.had_error:
+        return 65
+
+    inferences = TypeInference(locals).infer(statements)
+    for inference in inferences:
+        print(inference)
+    proven = sum(inference.proven for inference in inferences)
+    print(f'{proven} of {len(inferences)} checked operations proven.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,23 +1,76 @@
-from typing import List, Optional
+from __future__ import annotations
 
-from . import util
-from .callable import Callable, Clock, LoxCallable
+import time
+
+from . import files, hashmap, modules, parallel, rope, specialize, util, vector
+from .callable import Callable, Clock, LoxCallable, NativeFunction, VARIADIC, to_number
 from .lox_class import LoxClass, LoxInstance
+from .rope import LoxRope
 from .ast import Expr, ExprOperation, Binary, Grouping, Literal, Unary, StmtOperation, Stmt, Variable, Var, Assign, \
-    Block, IfElse, Logical, WhileLoop, Call, Function, ReturnStmt, ClassDecl, Get, SetProp, ThisExpr, SuperExpr
-from .environment import Environment
+    Block, IfElse, Logical, WhileLoop, ForLoop, Call, Function, ReturnStmt, ClassDecl, Get, SetProp, ThisExpr, SuperExpr, \
+    ImportStmt
+from .budget import Budget, Limits
+from .environment import Cell, Environment
+from .layout import Access, CELL, FunctionLayout, LOCAL
+from .output import Output
+from .program import Program
 from .token import Token
 from .token_type import TokenType as TT
 from .util import ReturnValue, LoxRuntimeError
 
 
 class Interpreter(ExprOperation, StmtOperation):
-    def __init__(self, error_reporter):
+    def __init__(self, error_reporter, globals: Environment | None = None, locals: dict | None = None,
+                 limits: Limits | None = None, scheduler=None, stats=None, output: Output | None = None):
         self.error_reporter = error_reporter
-        self.globals = Environment()
-        self.environment = self.globals
-        self.locals = {}
-        self.globals.define('clock', Clock())
+        self.globals = globals if globals is not None else Interpreter.create_globals()
+        self.locals = locals if locals is not None else {}
+        # A table the interpreter was handed, like a Program's, may be shared
+        # with other interpreters, so imports add to a copy of it instead.
+        self.owns_locals = locals is None
+        # The slots of the running function, or script, and the cells its
+        # closure captured.
+        self.frame: list[object] = []
+        self.upvalues: list[Cell] = []
+        self.limits = limits
+        self.budget: Budget | None = None
+        self.scheduler = scheduler
+        self.stats = stats
+        self.output = output if output is not None else Output()
+        # Where the running script lives, for relative imports. None means
+        # the working directory.
+        self.directory: str | None = None
+        self.modules: set[modules.Module] = set()
+
+    @staticmethod
+    def create_globals() -> Environment:
+        globals = Environment()
+        globals.define('clock', Clock())
+        globals.define('number', NativeFunction('number', 1, to_number))
+        vector.define_natives(globals)
+        hashmap.define_natives(globals)
+        files.define_natives(globals)
+        parallel.define_natives(globals)
+        return globals
+
+    def interpret(self, program: Program):
+        # An interpreter that outlives a program, like the REPL's, has to keep
+        # its resolution data around for the functions it defined.
+        if program.locals is not self.locals:
+            self.locals.update(program.locals)
+        if self.limits is not None:
+            self.budget = Budget(self.limits)
+
+        frame, upvalues = self.frame, self.upvalues
+        self.frame, self.upvalues = [None] * program.layout.frame_size, []
+        start = time.perf_counter()
+        try:
+            self.evaluate(program.statements)
+        finally:
+            self.frame, self.upvalues = frame, upvalues
+            self.output.flush()
+            if self.stats is not None:
+                self.stats.lap('execute', start)
 
     def on_return_stmt(self, returnstmt: ReturnStmt):
         return_value = None
@@ -26,15 +79,55 @@ class Interpreter(ExprOperation, StmtOperation):
 
         raise ReturnValue(return_value)
 
-    def resolve(self, expr: Expr, depth: int):
-        self.locals[expr] = depth
-
     def lookup_variable(self, token: Token, expr: Expr):
-        if expr in self.locals:
-            depth = self.locals[expr]
-            return self.environment.get_at(depth, token.lexeme)
+        access = self.locals.get(expr)
+        if access is None:
+            return self.lookup_global(token, expr)
+        return self.read(access)
+
+    def lookup_global(self, token: Token, expr: Variable):
+        globals = self.globals
+        value = globals.get(token)
+        expr.version = globals.version
+        expr.slot = globals.slots[token.lexeme]
+        return value
+
+    def read(self, access: Access):
+        kind = access.kind
+        if kind == LOCAL:
+            return self.frame[access.index]
+        elif kind == CELL:
+            return self.frame[access.index].value
         else:
-            return self.globals.get(token)
+            return self.upvalues[access.index].value
+
+    def write(self, access: Access, value):
+        kind = access.kind
+        if kind == LOCAL:
+            self.frame[access.index] = value
+        elif kind == CELL:
+            self.frame[access.index].value = value
+        else:
+            self.upvalues[access.index].value = value
+
+    def declare(self, access: Access | None, name: str, value):
+        if access is None:
+            self.globals.define(name, value)
+        elif access.kind == CELL:
+            # A fresh cell each time, so closures made in different passes
+            # through a loop body don't share the variable.
+            self.frame[access.index] = Cell(value)
+            if self.stats is not None:
+                self.stats.cells += 1
+        else:
+            self.frame[access.index] = value
+
+    def closure(self, function: Function, layout: FunctionLayout, is_initializer: bool = False) -> LoxCallable:
+        frame, upvalues = self.frame, self.upvalues
+        captured = [frame[index] if is_local else upvalues[index] for is_local, index in layout.upvalues]
+        if self.stats is not None:
+            self.stats.closures += 1
+        return LoxCallable(function, layout, captured, is_initializer)
 
     def on_class_decl(self, classdecl: ClassDecl):
         superclass = None
@@ -43,30 +136,33 @@ class Interpreter(ExprOperation, StmtOperation):
             if not isinstance(superclass, LoxClass):
                 raise LoxRuntimeError(classdecl.superclass.name, 'Superclass must be a class.')
 
-        self.environment.define(classdecl.name.lexeme, None)
+        name, super_slot = self.locals[classdecl]
+        self.declare(name, classdecl.name.lexeme, None)
 
         if superclass is not None:
-            self.environment = Environment(self.environment)
-            self.environment.define('super', superclass)
+            self.declare(super_slot, 'super', superclass)
 
         methods = {}
         for method in classdecl.methods:
-            methods[method.name.lexeme] = LoxCallable(method, self.environment, method.name.lexeme == 'init')
+            methods[method.name.lexeme] = self.closure(method, self.locals[method], method.name.lexeme == 'init')
 
         klass = LoxClass(classdecl.name.lexeme, superclass, methods)
-        if superclass is not None:
-            self.environment = self.environment.enclosing
-        self.environment.assign(classdecl.name, klass)
+        if name is None:
+            self.globals.assign(classdecl.name, klass)
+        else:
+            self.write(name, klass)
 
     def on_super_expr(self, superexpr: SuperExpr):
-        depth = self.locals[superexpr]
-        superclass = self.environment.get_at(depth, 'super')
+        super_access, this_access = self.locals[superexpr]
+        superclass = self.read(super_access)
         method = superclass.find_method(superexpr.method.lexeme)
 
         if method is None:
             raise LoxRuntimeError(superexpr.method, f'Undefined property \'{superexpr.method.lexeme}\'.')
 
-        instance = self.environment.get_at(depth - 1, 'this')
+        instance = self.read(this_access)
+        if self.stats is not None:
+            self.stats.bound_methods += 1
         return method.bind(instance)
 
 
@@ -76,13 +172,25 @@ class Interpreter(ExprOperation, StmtOperation):
         return self.lookup_variable(thisexpr.keyword, thisexpr)
 
     def on_function(self, function: Function):
-        name = function.name.lexeme
-        self.environment.define(name, LoxCallable(function, self.environment))
+        layout = self.locals[function]
+        # The function's own slot has to hold its cell before the closure is
+        # made, in case the function refers to itself.
+        self.declare(layout.target, function.name.lexeme, None)
+        closure = self.closure(function, layout)
+        if layout.target is None:
+            self.globals.define(function.name.lexeme, closure)
+        else:
+            self.write(layout.target, closure)
 
     def on_get(self, get: Get):
         lhs = self._evaluate(get.expr)
 
         if isinstance(lhs, LoxInstance):
+            if self.stats is not None:
+                self.stats.property_lookups += 1
+                # Anything that isn't a field is a method, bound on the spot.
+                if get.name.lexeme not in lhs.fields:
+                    self.stats.bound_methods += 1
             return lhs.get(get.name)
         else:
             raise LoxRuntimeError(get.name, 'Only instances have properties.')
@@ -97,10 +205,24 @@ class Interpreter(ExprOperation, StmtOperation):
         if not isinstance(callee, Callable):
             raise LoxRuntimeError(call.paren, 'Can only call functions or classes')
 
-        if len(args) != callee.arity():
-            raise LoxRuntimeError(call.paren, f'Expected {callee.arity()} arguments but got {len(args)}.')
+        if self.budget is not None:
+            self.budget.step(call.paren)
+        if self.stats is not None:
+            self.stats.calls += 1
+        if self.scheduler is not None:
+            self.scheduler.checkpoint()
 
-        return callee.call(self, args)
+        arity = callee.arity()
+        if len(args) != arity and arity != VARIADIC:
+            raise LoxRuntimeError(call.paren, f'Expected {arity} arguments but got {len(args)}.')
+
+        try:
+            return callee.call(self, args)
+        except LoxRuntimeError as e:
+            # Natives have no token of their own, so blame the call site.
+            if e.token is None:
+                e.token = call.paren
+            raise
 
     def on_while_loop(self, whileloop: WhileLoop):
         condition = whileloop.condition
@@ -108,6 +230,29 @@ class Interpreter(ExprOperation, StmtOperation):
 
         while self._evaluate(condition):
             body.perform_operation(self)
+            if self.budget is not None:
+                self.budget.step(whileloop.keyword)
+            if self.scheduler is not None:
+                self.scheduler.checkpoint()
+
+    def on_for_loop(self, forloop: ForLoop):
+        if forloop.initializer is not None:
+            forloop.initializer.perform_operation(self)
+
+        condition = forloop.condition
+        increment = forloop.increment
+        body = forloop.body
+
+        # Variables declared in the body have slots in the frame, so
+        # iterations only allocate cells for the ones closures capture.
+        while condition.perform_operation(self):
+            body.perform_operation(self)
+            if increment is not None:
+                increment.perform_operation(self)
+            if self.budget is not None:
+                self.budget.step(forloop.keyword)
+            if self.scheduler is not None:
+                self.scheduler.checkpoint()
 
     def on_logical(self, logical: Logical):
         lhs = self._evaluate(logical.left)
@@ -139,59 +284,194 @@ class Interpreter(ExprOperation, StmtOperation):
                 else_stmt.perform_operation(self)
 
     def on_block(self, block: Block):
-        parent_env = self.environment
+        # Locals declared in the block already have slots in the frame.
+        for statement in block.statements:
+            statement.perform_operation(self)
 
-        # Create new environment on entering Block.
-        environment = Environment(parent_env)
-        self.execute_block(block, environment)
-
-    def execute_block(self, block, environment):
-        parent_env = self.environment
-        self.environment = environment
+    def execute_function(self, statements: list[Stmt], frame: list[object], upvalues: list[Cell]):
+        parent_frame, parent_upvalues = self.frame, self.upvalues
+        self.frame, self.upvalues = frame, upvalues
 
         try:
-            statements = block.statements
             for statement in statements:
                 statement.perform_operation(self)
         finally:
-            # Set environment back to parent environment on leaving block.
-            self.environment = parent_env
+            self.frame, self.upvalues = parent_frame, parent_upvalues
 
     def on_assign(self, assign: Assign):
         value = self._evaluate(assign.value)
-        if assign in self.locals:
-            depth = self.locals[assign]
-            self.environment.assign_at(depth, assign.identifier, value)
+        globals = self.globals
+        if assign.version is globals.version:
+            globals.values[assign.slot] = value
+            return
+
+        access = self.locals.get(assign)
+        if access is not None:
+            self.write(access, value)
         else:
-            self.globals.assign(assign.identifier, value)
+            globals.assign(assign.identifier, value)
+            assign.version = globals.version
+            assign.slot = globals.slots[assign.identifier.lexeme]
 
     def on_variable(self, variable: Variable):
+        # Only ever true for globals, whose cached slot is still good.
+        globals = self.globals
+        if variable.version is globals.version:
+            return globals.values[variable.slot]
         return self.lookup_variable(variable.name, variable)
 
+    def on_import_stmt(self, importstmt: ImportStmt):
+        module = modules.imported.get((self.directory, importstmt.path.literal))
+        if module is None:
+            module = modules.load(self, importstmt)
+        # Importing a module again is a no-op, like in Python.
+        if module in self.modules:
+            return
+        self.modules.add(module)
+        if not self.owns_locals:
+            self.locals = dict(self.locals)
+            self.owns_locals = True
+        self.locals.update(module.locals)
+        globals = self.globals
+        for name, value in module.exports:
+            globals.define(name, value)
+
     def on_var(self, var: Var):
         initializer_value = self._evaluate(var.initializer)
-        self.environment.define(var.name.lexeme, initializer_value)
+        self.declare(self.locals.get(var), var.name.lexeme, initializer_value)
 
 
-    def evaluate(self, statements: List[Stmt]):
+    def evaluate(self, statements: list[Stmt]):
         try:
             for statement in statements:
                 statement.perform_operation(self)
         except LoxRuntimeError as e:
+            # So the error comes after everything the program printed.
+            self.output.flush()
             self.error_reporter.runtime_error(e)
 
-    def _evaluate(self, expr: Optional[Expr]):
+    def _evaluate(self, expr: Expr | None):
         if expr is not None:
             return expr.perform_operation(self)
         else:
             return None
 
     def on_binary(self, binary: Binary):
-        operator_token = binary.operator
-        operator = operator_token.type
         lhs = self._evaluate(binary.left)
         rhs = self._evaluate(binary.right)
 
+        if binary.__class__ is Binary:
+            binary.__class__ = specialize.specialization(binary.operator.type, lhs, rhs)
+            if self.stats is not None and binary.__class__ is not specialize.GenericBinary:
+                self.stats.specializations += 1
+
+        return self.binary_operation(binary, lhs, rhs)
+
+    def deoptimize(self, binary: Binary, lhs, rhs):
+        binary.__class__ = specialize.GenericBinary
+        if self.stats is not None:
+            self.stats.deoptimizations += 1
+        return self.binary_operation(binary, lhs, rhs)
+
+    def on_float_add(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs + rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_subtract(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs - rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_multiply(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs * rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_divide(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs / rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_greater(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs > rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_greater_equal(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs >= rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_less(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs < rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_float_less_equal(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return lhs <= rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_string_add(self, binary: Binary):
+        lhs = binary.left.perform_operation(self)
+        rhs = binary.right.perform_operation(self)
+        if isinstance(lhs, str) and isinstance(rhs, str):
+            return rope.concat(lhs, rhs)
+        if isinstance(lhs, (str, LoxRope)) and isinstance(rhs, (str, LoxRope)):
+            return lhs + rhs
+        return self.deoptimize(binary, lhs, rhs)
+
+    def on_number_add(self, binary: Binary):
+        return binary.left.perform_operation(self) + binary.right.perform_operation(self)
+
+    def on_number_subtract(self, binary: Binary):
+        return binary.left.perform_operation(self) - binary.right.perform_operation(self)
+
+    def on_number_multiply(self, binary: Binary):
+        return binary.left.perform_operation(self) * binary.right.perform_operation(self)
+
+    def on_number_divide(self, binary: Binary):
+        return binary.left.perform_operation(self) / binary.right.perform_operation(self)
+
+    def on_number_greater(self, binary: Binary):
+        return binary.left.perform_operation(self) > binary.right.perform_operation(self)
+
+    def on_number_greater_equal(self, binary: Binary):
+        return binary.left.perform_operation(self) >= binary.right.perform_operation(self)
+
+    def on_number_less(self, binary: Binary):
+        return binary.left.perform_operation(self) < binary.right.perform_operation(self)
+
+    def on_number_less_equal(self, binary: Binary):
+        return binary.left.perform_operation(self) <= binary.right.perform_operation(self)
+
+    def on_string_concat(self, binary: Binary):
+        return rope.concat(binary.left.perform_operation(self), binary.right.perform_operation(self))
+
+    def on_number_negate(self, unary: Unary):
+        return -unary.expr.perform_operation(self)
+
+    def binary_operation(self, binary: Binary, lhs, rhs):
+        operator_token = binary.operator
+        operator = operator_token.type
+
         if operator == TT.EQUAL_EQUAL:
             return lhs == rhs
         elif operator == TT.BANG_EQUAL:
@@ -209,16 +489,18 @@ class Interpreter(ExprOperation, StmtOperation):
             Interpreter.check_number_operands(operator_token, lhs, rhs)
             return lhs <= rhs
         elif operator == TT.MINUS:
-            Interpreter.check_number_operands(operator_token, lhs, rhs)
+            Interpreter.check_arithmetic_operands(operator_token, lhs, rhs)
             return lhs - rhs
         elif operator == TT.PLUS:
             Interpreter.check_numorstring_operands(operator_token, lhs, rhs)
+            if isinstance(lhs, str) and isinstance(rhs, str):
+                return rope.concat(lhs, rhs)
             return lhs + rhs
         elif operator == TT.SLASH:
-            Interpreter.check_number_operands(operator_token, lhs, rhs)
+            Interpreter.check_arithmetic_operands(operator_token, lhs, rhs)
             return lhs / rhs
         elif operator == TT.STAR:
-            Interpreter.check_number_operands(operator_token, lhs, rhs)
+            Interpreter.check_arithmetic_operands(operator_token, lhs, rhs)
             return lhs * rhs
         else:
             raise LoxRuntimeError(binary.operator, f'Unexpected operand {operator}')
@@ -243,7 +525,7 @@ class Interpreter(ExprOperation, StmtOperation):
             raise LoxRuntimeError(unary.operator, f'Unexpected {operator}. Expected - or !')
 
     def on_print(self, printstmt):
-        print(util.stringified(self._evaluate(printstmt.expr)))
+        self.output.write_line(str(util.stringified(self._evaluate(printstmt.expr))))
 
     def on_expression(self, exprstmt):
         self._evaluate(exprstmt.expr)
@@ -263,12 +545,31 @@ class Interpreter(ExprOperation, StmtOperation):
         if (not isinstance(lhs, float)) or (not isinstance(rhs, float)):
             raise LoxRuntimeError(operator, f'Expected number operands for operator: {operator.lexeme}')
 
+    @staticmethod
+    def check_arithmetic_operands(operator: Token, lhs, rhs):
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            return
+
+        if not vector.is_vector_operation(lhs, rhs):
+            raise LoxRuntimeError(operator, f'Expected number operands for operator: {operator.lexeme}')
+
+        Interpreter.check_vector_lengths(operator, lhs, rhs)
+
+    @staticmethod
+    def check_vector_lengths(operator: Token, lhs, rhs):
+        if not vector.lengths_match(lhs, rhs):
+            raise LoxRuntimeError(operator, f'Vector lengths {len(lhs)} and {len(rhs)} do not match.')
+
     @staticmethod
     def check_numorstring_operands(operator: Token, lhs, rhs):
         if isinstance(lhs, float) and isinstance(rhs, float):
             return
 
-        if isinstance(lhs, str) and isinstance(rhs, str):
+        if isinstance(lhs, (str, LoxRope)) and isinstance(rhs, (str, LoxRope)):
+            return
+
+        if vector.is_vector_operation(lhs, rhs):
+            Interpreter.check_vector_lengths(operator, lhs, rhs)
             return
 
         raise LoxRuntimeError(operator, f'Expected either only number or string operands for operator: {operator.lexeme}')
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+# How a resolved variable is reached at runtime. Locals live in a slot of the
+# frame of the function that declares them. Locals that an inner function
+# captures hold a Cell in their slot instead, and the inner function reaches
+# that cell through its own list of upvalues.
+LOCAL = 0
+CELL = 1
+UPVALUE = 2
+
+
+class Access:
+    def __init__(self, kind: int, index: int):
+        self.kind = kind
+        self.index = index
+
+    # Snapshots hold one of these per local, and a constructor call unpickles
+    # much faster than a restored __dict__.
+    def __reduce__(self):
+        return Access, (self.kind, self.index)
+
+    def __repr__(self):
+        return f'Access({self.kind}, {self.index})'
+
+
+# What the resolver works out about a function body, or about the top level of
+# a script: how many slots its frame needs, which of its parameters have to be
+# boxed because they are captured, and where each of its upvalues comes from.
+# An upvalue is either a cell in the enclosing frame (`is_local`) or one of
+# the enclosing function's own upvalues.
+class FunctionLayout:
+    def __init__(self, has_this: bool = False):
+        self.frame_size = 0
+        self.has_this = has_this
+        self.cells: list[int] = []
+        self.upvalues: list[tuple[bool, int]] = []
+        self.target: Access | None = None
+
+    def allocate(self) -> int:
+        self.frame_size += 1
+        return self.frame_size - 1
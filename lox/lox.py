@@ -1,32 +1,93 @@
+from __future__ import annotations
+
+import time
+
+from .budget import Limits
+from .environment import Environment
+from .infer import TypeInference
 from .interpreter import Interpreter
-from .parser import Parser
+from .output import Output
+from .parser import Parser, StreamParser
+from .program import Program
 from .resolver import Resolver
 from .scanner import Scanner
+from .token_stream import CompactScanner
 from .token import Token
 from .token_type import TokenType as TT
 from .util import LoxRuntimeError
 
+# Sources at least this long are scanned into a TokenStream, whose tokens
+# take a tenth of the memory of a list of Tokens.
+COMPACT_SOURCE_SIZE = 1024 * 1024
+
 
-class Lox:
+# Reports runtime errors only, for interpreters that run compiled code and so
+# need no scanner, parser or interpreter of a Lox of their own.
+class RuntimeErrorReporter:
     def __init__(self):
+        self.had_runtime_error = False
+
+    def runtime_error(self, runtime_error: LoxRuntimeError):
+        print(f'{repr(runtime_error)} \n[line: {runtime_error.token.line}]')
+        self.had_runtime_error = True
+
+
+class Lox(RuntimeErrorReporter):
+    def __init__(self, limits: Limits | None = None, stats=None, output: Output | None = None):
         self.had_error = False
         self.had_runtime_error = False
-        self.interpreter = Interpreter(self)
+        # A lox.stats.Stats, shared with the interpreters this runs programs on.
+        self.stats = stats
+        # Where printed lines go, stdout by default. Shared with the
+        # interpreters this runs programs on.
+        self.output = output if output is not None else Output()
+        self.interpreter = Interpreter(self, limits=limits, stats=stats, output=self.output)
+        # Resolves straight into the interpreter's table, so code run on it
+        # doesn't have to be merged in afterwards.
+        self.resolver = Resolver(self, self.interpreter.locals)
 
     def run(self, code: str):
-        scanner = Scanner(code, self)
+        program = self.compile(code, self.resolver)
+        if program is not None:
+            self.interpreter.interpret(program)
+
+    def compile(self, code: str, resolver: Resolver | None = None) -> Program | None:
+        self.had_error = False
+        start = time.perf_counter()
+
+        compact = len(code) >= COMPACT_SOURCE_SIZE
+        scanner = CompactScanner(code, self) if compact else Scanner(code, self)
         tokens = scanner.scan_tokens()
+        if self.stats is not None:
+            start = self.stats.lap('scan', start)
 
-        parser = Parser(tokens, self)
+        parser = StreamParser(tokens, self) if compact else Parser(tokens, self)
         statements = parser.parse()
+        if self.stats is not None:
+            start = self.stats.lap('parse', start)
 
-        resolver = Resolver(self.interpreter)
-        resolver.resolve_stmts(statements)
+        if statements is None:
+            return None
 
-        if self.had_error or statements is None:
-            return
-        else:
-            self.interpreter.evaluate(statements)
+        if resolver is None:
+            resolver = Resolver(self, {})
+        layout = resolver.resolve_script(statements)
+        if self.stats is not None:
+            start = self.stats.lap('resolve', start)
+
+        if self.had_error:
+            return None
+
+        TypeInference(resolver.locals).infer(statements)
+        if self.stats is not None:
+            self.stats.lap('infer', start)
+        return Program(statements, resolver.locals, layout)
+
+    def execute(self, program: Program, globals: Environment | None = None, limits: Limits | None = None):
+        # Runs on its own interpreter, in `globals` if given and otherwise in a
+        # fresh global environment, leaving `self.interpreter` untouched.
+        interpreter = Interpreter(self, globals, program.locals, limits, stats=self.stats, output=self.output)
+        interpreter.interpret(program)
 
     def error(self, line: int, message: str):
         self.report(line, '', message)
@@ -37,10 +98,6 @@ class Lox:
         else:
             self.report(token.line, f' at \'{token.lexeme}\'', msg)
 
-    def runtime_error(self, runtime_error: LoxRuntimeError):
-        print(f'{repr(runtime_error)} \n[line: {runtime_error.token.line}]')
-        self.had_runtime_error = True
-
     def report(self, line: int, where: str, message: str):
         print(f'[line: {line}] Error{where}: {message}')
         self.had_error = True
@@ -1,4 +1,4 @@
-from typing import List, Any, Dict
+from __future__ import annotations
 
 from lox.ast import Function
 from lox.callable import Callable, LoxCallable
@@ -7,7 +7,7 @@ from lox.util import LoxRuntimeError
 
 
 class LoxClass(Callable):
-    def __init__(self, name, superclass, methods: Dict[str, LoxCallable]):
+    def __init__(self, name, superclass, methods: dict[str, LoxCallable]):
         self.methods = methods
         self.superclass = superclass
         self.name = name
@@ -22,10 +22,16 @@ class LoxClass(Callable):
         else:
             return 0
 
-    def call(self, interpreter, args: List[Any]):
+    def call(self, interpreter, args: list[object]):
         instance = LoxInstance(self)
+        if interpreter.budget is not None:
+            interpreter.budget.allocations += 1
+        if interpreter.stats is not None:
+            interpreter.stats.instances += 1
         initializer = self.find_method('init')
         if initializer is not None:
+            if interpreter.stats is not None:
+                interpreter.stats.bound_methods += 1
             initializer.bind(instance).call(interpreter, args)
         return instance
 
@@ -43,7 +49,7 @@ class LoxClass(Callable):
 class LoxInstance:
     def __init__(self, klass: LoxClass):
         self.klass = klass
-        self.fields: Dict[str, Any] = {}
+        self.fields: dict[str, object] = {}
 
     def __str__(self):
         return f'<{str(self.klass)[1:-1]} instance>'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+import argparse
+import mmap
+import multiprocessing
+import os
+import sys
+
+from . import parallel, util
+from .callable import LoxCallable
+from .lox import Lox
+from .util import LoxRuntimeError
+
+EX_DATAERR = 65
+EX_SOFTWARE = 70
+
+# Each worker process compiles the job script once and keeps its map and
+# reduce functions around for every partition it is handed.
+job = None
+
+
+class Job:
+    def __init__(self, script_path: str):
+        self.lox = Lox()
+        with open(script_path, 'r') as file:
+            self.lox.run(file.read())
+        if self.lox.had_error or self.lox.had_runtime_error:
+            raise SystemExit(EX_DATAERR if self.lox.had_error else EX_SOFTWARE)
+
+        self.interpreter = self.lox.interpreter
+        self.map = self.function('map', 1)
+        self.reduce = self.function('reduce', 2)
+
+    def function(self, name: str, arity: int) -> LoxCallable:
+        function = self.interpreter.globals.lookup(name)
+        if not isinstance(function, LoxCallable) or function.arity() != arity:
+            print(f'Error: script must define fun {name} with {arity} parameter(s).', file=sys.stderr)
+            raise SystemExit(EX_DATAERR)
+        return function
+
+    def combine(self, lhs, rhs):
+        return self.reduce.call(self.interpreter, [lhs, rhs])
+
+
+def partitions(path: str, count: int):
+    # Splits the file into about `count` byte ranges that end on line breaks.
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        bounds = [0]
+        for i in range(1, count):
+            newline = data.find(b'\n', max(size * i // count, bounds[-1]))
+            if newline == -1:
+                break
+            if newline + 1 > bounds[-1]:
+                bounds.append(newline + 1)
+        if bounds[-1] != size:
+            bounds.append(size)
+
+    return list(zip(bounds, bounds[1:]))
+
+
+def run_partition(script_path: str, input_path: str, start: int, end: int):
+    global job
+    if job is None:
+        job = Job(script_path)
+
+    interpreter = job.interpreter
+    map_fn = job.map
+    result = None
+    has_result = False
+
+    try:
+        with open(input_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = start
+            while pos < end:
+                newline = data.find(b'\n', pos, end)
+                line_end = newline if newline != -1 else end
+                line = data[pos:line_end].decode('utf-8').rstrip('\r')
+                pos = line_end + 1
+
+                mapped = map_fn.call(interpreter, [line])
+                if has_result:
+                    result = job.combine(result, mapped)
+                else:
+                    result, has_result = mapped, True
+
+        return True, has_result, parallel.dumps(result, interpreter.globals, interpreter.locals)
+    except LoxRuntimeError as e:
+        line = e.token.line if e.token is not None else '?'
+        return False, False, f'{repr(e)} \n[line: {line}]'
+    finally:
+        interpreter.output.flush()
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(prog='python -m lox.mapreduce',
+                                         description='Apply a Lox map(line) to every line of a file and combine the '
+                                                     'results with reduce(a, b).')
+    arg_parser.add_argument('script', help='Lox script defining map(line) and reduce(a, b)')
+    arg_parser.add_argument('input', help='input file, split into partitions on line boundaries')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    arg_parser.add_argument('--partitions', type=int, default=None,
+                            help='number of partitions (default: 4 per worker)')
+    args = arg_parser.parse_args(argv)
+
+    # The parent process only combines the partial results, in input order.
+    parent = Job(args.script)
+    tasks = [(args.script, args.input, start, end)
+             for start, end in partitions(args.input, args.partitions or args.jobs * 4)]
+
+    with multiprocessing.Pool(processes=args.jobs) as pool:
+        partials = pool.starmap(run_partition, tasks)
+
+    result = None
+    has_result = False
+    try:
+        for ok, partial_has_result, partial in partials:
+            if not ok:
+                parent.interpreter.output.flush()
+                print(partial)
+                return EX_SOFTWARE
+            if not partial_has_result:
+                continue
+
+            value = parallel.loads(partial, parent.interpreter.globals, parent.interpreter.locals)
+            if has_result:
+                result = parent.combine(result, value)
+            else:
+                result, has_result = value, True
+    except LoxRuntimeError as e:
+        parent.interpreter.output.flush()
+        parent.lox.runtime_error(e)
+        return EX_SOFTWARE
+
+    parent.interpreter.output.flush()
+    print(util.stringified(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+
+from lox.ast import ImportStmt
+from lox.program import Program
+from lox.util import LoxRuntimeError
+
+# Bumped whenever the pickled form of compiled programs changes.
+CACHE_VERSION = 1
+
+# Compiled modules are cached on disk next to their source, like __pycache__.
+CACHE_DIRECTORY = '__loxcache__'
+
+
+# A module that has run. Importing it defines its exports, every global its
+# top level defined or redefined, in the importer's globals, and adds the
+# resolution data of its functions to the importer's. The exports are copies:
+# the module's functions look globals up in whichever interpreter calls them,
+# and there they find the importer's copies.
+class Module:
+    def __init__(self, path: str, exports: list[tuple[str, object]], locals: dict[object, object]):
+        self.path = path
+        self.exports = exports
+        self.locals = locals
+
+
+# Modules by the directory they were imported from and the path they were
+# imported as, so importing a module again is a dict lookup. Each module runs
+# once per process however many programs and interpreters import it.
+imported: dict[tuple[str | None, str], Module] = {}
+modules: dict[str, Module] = {}
+# Compiled modules by the SHA-256 of their source.
+compiled: dict[str, Program] = {}
+# Modules whose top level is running, to catch import cycles.
+loading: set[str] = set()
+
+
+def load(interpreter, importstmt: ImportStmt) -> Module:
+    relative = importstmt.path.literal
+    path = os.path.abspath(os.path.join(interpreter.directory or '', relative))
+    module = modules.get(path)
+    if module is None:
+        if path in loading:
+            raise LoxRuntimeError(importstmt.path, f'Import cycle through \'{relative}\'.')
+        loading.add(path)
+        try:
+            module = run(interpreter, importstmt, path)
+        finally:
+            loading.discard(path)
+        modules[path] = module
+
+    imported[interpreter.directory, relative] = module
+    return module
+
+
+def run(interpreter, importstmt: ImportStmt, path: str) -> Module:
+    from lox.interpreter import Interpreter
+    from lox.lox import Lox
+
+    try:
+        with open(path, 'rb') as file:
+            source = file.read()
+    except OSError as e:
+        raise LoxRuntimeError(importstmt.path, f'Cannot import \'{importstmt.path.literal}\': {e.strerror}.')
+
+    # Errors in the module are reported as the module's, and then fail the
+    # import.
+    lox = Lox(stats=interpreter.stats, output=interpreter.output)
+    program = compile_module(lox, source, path)
+    if program is None:
+        raise LoxRuntimeError(importstmt.path, f'Cannot compile \'{importstmt.path.literal}\'.')
+
+    globals = Interpreter.create_globals()
+    builtins = dict(globals.items())
+    module_interpreter = Interpreter(lox, globals, program.locals, interpreter.limits, output=lox.output)
+    module_interpreter.directory = os.path.dirname(path)
+    module_interpreter.interpret(program)
+    if lox.had_runtime_error:
+        raise LoxRuntimeError(importstmt.path, f'Importing \'{importstmt.path.literal}\' failed.')
+
+    exports = [(name, value) for name, value in globals.items() if builtins.get(name, builtins) is not value]
+    # The module interpreter's table, which has the modules it imported too.
+    return Module(path, exports, module_interpreter.locals)
+
+
+def compile_module(lox, source: bytes, path: str) -> Program | None:
+    import hashlib
+
+    digest = hashlib.sha256(source).hexdigest()
+    program = compiled.get(digest)
+    if program is not None:
+        return program
+
+    cache_path = os.path.join(os.path.dirname(path), CACHE_DIRECTORY, f'{digest}.pickle')
+    program = read_cache(cache_path)
+    if program is None:
+        program = lox.compile(source.decode())
+        if program is None:
+            return None
+        # Before the program first runs, while its nodes hold no runtime
+        # caches yet.
+        write_cache(cache_path, program)
+
+    compiled[digest] = program
+    return program
+
+
+def read_cache(cache_path: str) -> Program | None:
+    import pickle
+    from lox.snapshot import PickleContext
+
+    # A missing, truncated or stale cache is only a miss, and unpickling a
+    # damaged file can raise almost anything.
+    try:
+        with open(cache_path, 'rb') as file, PickleContext():
+            unpickler = pickle.Unpickler(file)
+            if unpickler.load() != CACHE_VERSION:
+                return None
+            program = unpickler.load()
+    except Exception:
+        return None
+    return program if isinstance(program, Program) else None
+
+
+def write_cache(cache_path: str, program: Program):
+    import pickle
+    from lox.snapshot import PickleContext
+
+    # A cache that can't be written, say in a read-only directory, only costs
+    # the next process a compile.
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f'{cache_path}.{os.getpid()}'
+        with open(temporary, 'wb') as file, PickleContext():
+            pickler = pickle.Pickler(file, pickle.HIGHEST_PROTOCOL)
+            pickler.dump(CACHE_VERSION)
+            pickler.dump(program)
+        os.replace(temporary, cache_path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        pass
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sys
+
+# Characters of printed text held back before they are written out.
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+# Where an interpreter's print statements go. Lines are collected and written
+# to `file` in one go once `buffer_size` characters have piled up, instead of
+# going through `print` and the file's own, possibly line, buffering one line
+# at a time. Without a file they go to whatever sys.stdout is when they are
+# written, so redirect_stdout keeps working. Interpreters flush at the end of
+# a program and before reporting a runtime error; anything else that runs Lox
+# code, like a spawned function, flushes when it is done.
+class Output:
+    def __init__(self, file=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.lines: list[str] = []
+        self.size = 0
+
+    def write_line(self, line: str):
+        self.lines.append(line)
+        self.size += len(line) + 1
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        file = self.file if self.file is not None else sys.stdout
+        if self.lines:
+            self.lines.append('')
+            file.write('\n'.join(self.lines))
+            self.lines = []
+            self.size = 0
+        file.flush()
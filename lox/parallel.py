@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import io
+import os
+import time
+
+from lox.ast import Assign, Expr, Function, Stmt, Variable
+from lox.budget import Budget, Limits
+from lox.callable import Callable, LoxCallable, VARIADIC
+from lox.files import LoxFile
+from lox.lox_class import LoxInstance
+from lox.util import BudgetKind, LoxBudgetError, LoxRuntimeError
+
+# Created on the first spawn, so scripts that never spawn don't start workers.
+pool = None
+
+
+class LoxFuture:
+    def __init__(self, future):
+        self.future = future
+
+    def __str__(self):
+        return '<future>'
+
+
+# Spawned functions, their arguments and their results are pickled. The
+# global environment of the sending interpreter is replaced by a placeholder
+# so that only the globals a function refers to are sent along, as copies.
+# The resolution data of every AST node sent is appended to the same pickle,
+# whose memo keeps the nodes identical to the ones in the value. If given,
+# `declarations` collects the declaration of every function sent, however
+# deep in the value, like in a closure's cells or a map.
+def dumps(obj, globals, locals: dict[object, object], declarations: set[Function] | None = None) -> bytes:
+    import pickle
+
+    sent_locals = {}
+
+    class LoxPickler(pickle.Pickler):
+        def persistent_id(self, obj):
+            return 'globals' if obj is globals else None
+
+        def reducer_override(self, obj):
+            if isinstance(obj, (LoxInstance, LoxFuture, LoxFile)):
+                raise LoxRuntimeError(None, f'Cannot send {obj} to another process. Only numbers, strings, '
+                                            f'booleans, nil, vectors, maps, functions and classes can be sent.')
+            if isinstance(obj, (Expr, Stmt)) and obj in locals:
+                sent_locals[obj] = locals[obj]
+            elif declarations is not None and isinstance(obj, LoxCallable):
+                declarations.add(obj.declaration)
+            return NotImplemented
+
+    file = io.BytesIO()
+    pickler = LoxPickler(file, pickle.HIGHEST_PROTOCOL)
+    pickler.dump(obj)
+    pickler.dump(sent_locals)
+    return file.getvalue()
+
+
+def loads(data: bytes, globals, locals: dict[object, object]):
+    import pickle
+
+    class LoxUnpickler(pickle.Unpickler):
+        def persistent_load(self, pid):
+            return globals
+
+    unpickler = LoxUnpickler(io.BytesIO(data))
+    obj = unpickler.load()
+    locals.update(unpickler.load())
+    return obj
+
+
+def iter_nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        for val in vars(node).values():
+            if isinstance(val, (Expr, Stmt)):
+                stack.append(val)
+            elif isinstance(val, list):
+                stack.extend(item for item in val if isinstance(item, (Expr, Stmt)))
+
+
+# The globals a function's body refers to, not counting those of the
+# functions it calls.
+def global_names(declaration: Function, locals: dict[object, object]) -> set[str]:
+    names = set()
+    for node in iter_nodes(declaration):
+        if isinstance(node, (Variable, Assign)) and node not in locals:
+            names.add(node.name.lexeme if isinstance(node, Variable) else node.identifier.lexeme)
+    return names
+
+
+def run_spawned(payload: bytes, limits: Limits | None = None):
+    from lox.interpreter import Interpreter
+    from lox.lox import RuntimeErrorReporter
+
+    globals = Interpreter.create_globals()
+    interpreter = Interpreter(RuntimeErrorReporter(), globals, limits=limits)
+    if limits is not None:
+        interpreter.budget = Budget(limits)
+    global_values, function, args = loads(payload, globals, interpreter.locals)
+    for name, val in global_values.items():
+        globals.define(name, val)
+
+    try:
+        return True, dumps(function.call(interpreter, args), globals, interpreter.locals)
+    except LoxRuntimeError as e:
+        line = e.token.line if e.token is not None else '?'
+        return False, f'{e} [line: {line}]'
+    finally:
+        interpreter.output.flush()
+
+
+# A spawned call runs under the caller's limits, with a budget of its own for
+# steps and allocations and only the time the caller has left, so that a
+# worker stops by the caller's deadline too.
+def spawned_limits(interpreter) -> Limits | None:
+    budget = interpreter.budget
+    if budget is None or budget.deadline is None:
+        return interpreter.limits
+    limits = budget.limits
+    return Limits(limits.max_steps, max(0.0, budget.deadline - time.monotonic()), limits.max_allocations)
+
+
+def time_budget_error(budget: Budget) -> LoxBudgetError:
+    return LoxBudgetError(None, BudgetKind.TIME, f'{budget.limits.max_seconds:g}s')
+
+
+class Spawn(Callable):
+    def __init__(self):
+        self.global_names: dict[Function, set[str]] = {}
+        # The globals the last spawn of a function sent, which the next one
+        # starts from.
+        self.sent_globals: dict[Function, set[str]] = {}
+
+    def call(self, interpreter, args: list[object]):
+        global pool
+        if not args or not isinstance(args[0], LoxCallable):
+            raise LoxRuntimeError(None, 'Can only spawn functions.')
+
+        function, function_args = args[0], args[1:]
+        if len(function_args) != function.arity():
+            raise LoxRuntimeError(None, f'Expected {function.arity()} arguments but got {len(function_args)}.')
+
+        # Every function that gets pickled, whether it is a global, sits in
+        # a closure's cells or in an argument, can refer to more globals,
+        # whose values can hold more functions. Pickle until no new ones turn
+        # up, which after the first spawn of a function is usually at once.
+        globals, locals = interpreter.globals, interpreter.locals
+        names = self.sent_globals.get(function.declaration, set())
+        global_values = {name: globals.lookup(name) for name in names if name in globals.slots}
+        while True:
+            declarations = set()
+            payload = dumps((global_values, function, function_args), globals, locals, declarations)
+            new_names = set()
+            for declaration in declarations:
+                referenced = self.global_names.get(declaration)
+                if referenced is None:
+                    referenced = self.global_names[declaration] = global_names(declaration, locals)
+                new_names |= referenced
+            new_names -= names
+            if not new_names:
+                break
+            names = names | new_names
+            global_values.update((name, globals.lookup(name)) for name in new_names if name in globals.slots)
+        self.sent_globals[function.declaration] = names
+
+        limits = spawned_limits(interpreter)
+        if pool is None:
+            import multiprocessing
+            if multiprocessing.current_process().daemon:
+                return self.run_here(interpreter, payload, limits)
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(os.cpu_count())
+        return LoxFuture(pool.submit(run_spawned, payload, limits))
+
+    @staticmethod
+    def run_here(interpreter, payload: bytes, limits: Limits | None) -> LoxFuture:
+        # Workers of lox.batch and lox.mapreduce are daemonic and can't start
+        # workers of their own, so there the call runs right away, still on
+        # copies, and its future is resolved already.
+        from concurrent.futures import Future
+
+        interpreter.output.flush()
+        future = Future()
+        future.set_result(run_spawned(payload, limits))
+        return LoxFuture(future)
+
+    def arity(self) -> int:
+        return VARIADIC
+
+    def __str__(self):
+        return '<native_fn spawn>'
+
+
+class Join(Callable):
+    def call(self, interpreter, args: list[object]):
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        future = args[0]
+        if not isinstance(future, LoxFuture):
+            raise LoxRuntimeError(None, 'Can only join futures.')
+
+        # Waits no longer than the caller's time budget allows.
+        budget = interpreter.budget
+        timeout = None
+        if budget is not None and budget.deadline is not None:
+            timeout = max(0.0, budget.deadline - time.monotonic())
+        try:
+            if interpreter.scheduler is not None:
+                # Only the joining program waits, the others keep running.
+                ok, result = interpreter.scheduler.wait_for_future(future.future, timeout)
+            else:
+                ok, result = future.future.result(timeout)
+        except FutureTimeoutError:
+            future.future.cancel()
+            raise time_budget_error(budget)
+        if not ok:
+            # A spawned call stops by the caller's deadline too, and is then
+            # out of the caller's budget rather than failing by itself.
+            if timeout is not None and time.monotonic() > budget.deadline:
+                raise time_budget_error(budget)
+            raise LoxRuntimeError(None, f'Spawned function failed: {result}')
+        return loads(result, interpreter.globals, interpreter.locals)
+
+    def arity(self) -> int:
+        return 1
+
+    def __str__(self):
+        return '<native_fn join>'
+
+
+def define_natives(environment):
+    environment.define('spawn', Spawn())
+    environment.define('join', Join())
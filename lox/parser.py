@@ -1,19 +1,49 @@
+from __future__ import annotations
+
 import sys
-from typing import List, Optional
 
 from .ast import Binary, Expr, Unary, Literal, Grouping, Print, Expression, Var, Variable, Assign, Block, Stmt, IfElse, \
-    Logical, WhileLoop, Call, Function, ReturnStmt, ClassDecl, Get, SetProp, ThisExpr, SuperExpr
+    Logical, WhileLoop, ForLoop, Call, Function, ReturnStmt, ClassDecl, Get, SetProp, ThisExpr, SuperExpr, ImportStmt
 from .token import Token
+from .token_stream import EOF, TokenStream, TYPES
 from .token_type import TokenType as TT
 from .util import FunctionKind
 
 
+class Precedence:
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+
+
+# Binary operators by token type, with their precedence and the node they build.
+infix_rules = {
+    TT.OR: (Precedence.OR, Logical),
+    TT.AND: (Precedence.AND, Logical),
+    TT.BANG_EQUAL: (Precedence.EQUALITY, Binary),
+    TT.EQUAL_EQUAL: (Precedence.EQUALITY, Binary),
+    TT.GREATER: (Precedence.COMPARISON, Binary),
+    TT.GREATER_EQUAL: (Precedence.COMPARISON, Binary),
+    TT.LESS: (Precedence.COMPARISON, Binary),
+    TT.LESS_EQUAL: (Precedence.COMPARISON, Binary),
+    TT.PLUS: (Precedence.TERM, Binary),
+    TT.MINUS: (Precedence.TERM, Binary),
+    TT.STAR: (Precedence.FACTOR, Binary),
+    TT.SLASH: (Precedence.FACTOR, Binary),
+}
+
+
 class Parser:
     class ParseError(Exception):
         def __init__(self, msg: str):
             super(Exception, self).__init__(msg)
 
-    def __init__(self, tokens: List[Token], error_reporter):
+    def __init__(self, tokens: list[Token], error_reporter):
         self.tokens = tokens
         self.curr = 0
         self.error_reporter = error_reporter
@@ -48,7 +78,10 @@ class Parser:
                 return True
 
     def check(self, type: TT):
-        return not self.at_end() and self.peek().type == type
+        return not self.at_end() and self.peek_type() == type
+
+    def peek_type(self) -> TT:
+        return self.tokens[self.curr].type
 
     def advance(self):
         if self.at_end():
@@ -82,21 +115,22 @@ class Parser:
         if not self.check(TT.SEMICOLON):
             value_expr = self.expression()
 
-        self.consume(TT.SEMICOLON, 'Expect \';\' after return.')
+        self.expect(TT.SEMICOLON, 'Expect \';\' after return.')
         return ReturnStmt(keyword, value_expr)
 
     def print_statement(self) -> Stmt:
         expr = self.expression()
-        self.consume(TT.SEMICOLON, 'Expected semicolon at end of statement.')
+        self.expect(TT.SEMICOLON, 'Expected semicolon at end of statement.')
         return Print(expr)
 
     def expr_statement(self) -> Stmt:
         expr = self.expression()
-        self.consume(TT.SEMICOLON, 'Expected semicolon at end of statement.')
+        self.expect(TT.SEMICOLON, 'Expected semicolon at end of statement.')
         return Expression(expr)
 
     def for_statement(self):
-        self.consume(TT.LEFT_PAREN, 'Expected opening parenthesis for for loop.')
+        keyword = self.previous()
+        self.expect(TT.LEFT_PAREN, 'Expected opening parenthesis for for loop.')
         initializer = None
         if self.match(TT.VAR):
             initializer = self.var_declaration()
@@ -112,27 +146,24 @@ class Parser:
         if not self.check(TT.RIGHT_PAREN):
             post_body_expr = self.expression()
 
-        self.consume(TT.RIGHT_PAREN, 'Expected closing parenthesis for for loop.')
+        self.expect(TT.RIGHT_PAREN, 'Expected closing parenthesis for for loop.')
 
         body = self.statement()
-        body = Block([body, Expression(post_body_expr)])
-
-        while_loop = WhileLoop(condition, body)
-
-        return Block([initializer, while_loop])
+        return ForLoop(keyword, initializer, condition, post_body_expr, body)
 
     def while_statement(self):
-        self.consume(TT.LEFT_PAREN, 'Expected opening parenthesis for while loop.')
+        keyword = self.previous()
+        self.expect(TT.LEFT_PAREN, 'Expected opening parenthesis for while loop.')
         condition = self.expression()
-        self.consume(TT.RIGHT_PAREN, 'Expected closing parenthesis for while loop.')
+        self.expect(TT.RIGHT_PAREN, 'Expected closing parenthesis for while loop.')
 
         body = self.statement()
-        return WhileLoop(condition, body)
+        return WhileLoop(keyword, condition, body)
 
     def ifelse_statement(self):
-        self.consume(TT.LEFT_PAREN, 'Expected opening parenthesis for conditional.')
+        self.expect(TT.LEFT_PAREN, 'Expected opening parenthesis for conditional.')
         condition = self.expression()
-        self.consume(TT.RIGHT_PAREN, 'Expected closing parenthesis for conditional.')
+        self.expect(TT.RIGHT_PAREN, 'Expected closing parenthesis for conditional.')
 
         then_statement = self.statement()
         else_statement = Expression(Literal(None))
@@ -142,7 +173,7 @@ class Parser:
 
         return IfElse(condition, then_statement, else_statement)
 
-    def declaration(self) -> Optional[Stmt]:
+    def declaration(self) -> Stmt | None:
         try:
             if self.match(TT.VAR):
                 return self.var_declaration()
@@ -150,6 +181,8 @@ class Parser:
                 return self.function(FunctionKind.FUNCTION)
             elif self.match(TT.CLASS):
                 return self.class_declaration()
+            elif self.match(TT.IMPORT):
+                return self.import_declaration()
             else:
                 return self.statement()
         except Parser.ParseError as e:
@@ -158,7 +191,7 @@ class Parser:
 
     def function(self, kind: FunctionKind) -> Function:
         ident = self.consume(TT.IDENTIFIER, f'Expect {kind.value} name')
-        self.consume(TT.LEFT_PAREN, f'Expect \'(\' after {kind.value} name')
+        self.expect(TT.LEFT_PAREN, f'Expect \'(\' after {kind.value} name')
 
         args = []
         if not self.check(TT.RIGHT_PAREN):
@@ -169,8 +202,8 @@ class Parser:
 
                 args.append(self.consume(TT.IDENTIFIER, 'Expect parameter name'))
 
-        self.consume(TT.RIGHT_PAREN, 'Expect \')\' after parameters.')
-        self.consume(TT.LEFT_BRACE, f'Expect \'{{\' before {kind.value} body.')
+        self.expect(TT.RIGHT_PAREN, 'Expect \')\' after parameters.')
+        self.expect(TT.LEFT_BRACE, f'Expect \'{{\' before {kind.value} body.')
         body = self.block()
 
         return Function(ident, args, body)
@@ -182,7 +215,7 @@ class Parser:
             if declaration is not None:
                 statements.append(declaration)
 
-        self.consume(TT.RIGHT_BRACE, 'Expect \'}\' at end of block.')
+        self.expect(TT.RIGHT_BRACE, 'Expect \'}\' at end of block.')
         return Block(statements)
 
     def class_declaration(self) -> ClassDecl:
@@ -190,19 +223,24 @@ class Parser:
 
         superclass = None
         if self.match(TT.LESS):
-            self.consume(TT.IDENTIFIER, 'Expect superclass name.')
-            superclass = Variable(self.previous())
+            superclass = Variable(self.consume(TT.IDENTIFIER, 'Expect superclass name.'))
 
-        self.consume(TT.LEFT_BRACE, 'Expect \'{\' before class body.')
+        self.expect(TT.LEFT_BRACE, 'Expect \'{\' before class body.')
 
         methods = []
         while not (self.check(TT.RIGHT_BRACE) or self.at_end()):
             methods.append(self.function(FunctionKind.METHOD))
 
-        self.consume(TT.RIGHT_BRACE, 'Expect \'}\' after class body.')
+        self.expect(TT.RIGHT_BRACE, 'Expect \'}\' after class body.')
 
         return ClassDecl(class_name, superclass, methods)
 
+    def import_declaration(self) -> ImportStmt:
+        keyword = self.previous()
+        path = self.consume(TT.STRING, 'Expect module path after \'import\'.')
+        self.expect(TT.SEMICOLON, 'Expected semicolon at end of statement.')
+        return ImportStmt(keyword, path)
+
     def var_declaration(self) -> Var:
         token = self.consume(TT.IDENTIFIER, 'Expected variable name.')
         initializer = None
@@ -210,15 +248,33 @@ class Parser:
         if self.match(TT.EQUAL):
             initializer = self.expression()
 
-        self.consume(TT.SEMICOLON, 'Expected semicolon at end of statement')
+        self.expect(TT.SEMICOLON, 'Expected semicolon at end of statement')
         return Var(token, initializer)
 
     def expression(self) -> Expr:
-        return self.assign()
+        return self.parse_precedence(Precedence.ASSIGNMENT)
+
+    def parse_precedence(self, precedence: int) -> Expr:
+        operator_type = self.peek_type()
+        if operator_type == TT.BANG or operator_type == TT.MINUS:
+            operator = self.advance()
+            rhs = self.parse_precedence(Precedence.UNARY)
+            expr = Unary(operator, rhs)
+        else:
+            expr = self.call()
 
-    def assign(self) -> Expr:
-        expr = self.or_()
-        if self.match(TT.EQUAL):
+        while True:
+            rule = infix_rules.get(self.peek_type())
+            if rule is None or rule[0] < precedence:
+                break
+
+            operator = self.advance()
+            rule_precedence, node = rule
+            # Operands bind tighter than the operator, which makes it left-associative.
+            rhs = self.parse_precedence(rule_precedence + 1)
+            expr = node(operator, expr, rhs)
+
+        if precedence == Precedence.ASSIGNMENT and self.match(TT.EQUAL):
             if isinstance(expr, Variable):
                 assignment_expr = self.expression()
                 return Assign(expr.name, assignment_expr)
@@ -226,77 +282,9 @@ class Parser:
                 return SetProp(expr.expr, expr.name, self.expression())
             else:
                 raise self.error(self.previous(), 'Invalid assignment target')
-        else:
-            return expr
-
-    def or_(self) -> Expr:
-        expr = self.and_()
-
-        while self.match(TT.OR):
-            operator = self.previous()
-            rhs = self.and_()
-            expr = Logical(operator, expr, rhs)
-
-        return expr
-
-    def and_(self) -> Expr:
-        expr = self.equality()
-
-        while self.match(TT.AND):
-            operator = self.previous()
-            rhs = self.equality()
-            expr = Logical(operator, expr, rhs)
-
-        return expr
-
-    def equality(self) -> Expr:
-        expr = self.comparison()
-
-        while self.match(TT.BANG_EQUAL, TT.EQUAL_EQUAL):
-            operator = self.previous()
-            rhs = self.comparison()
-            expr = Binary(operator, expr, rhs)
-
-        return expr
-
-    def comparison(self) -> Expr:
-        expr = self.addition()
-
-        while self.match(TT.GREATER_EQUAL, TT.GREATER, TT.LESS_EQUAL, TT.LESS):
-            operator = self.previous()
-            rhs = self.addition()
-            expr = Binary(operator, expr, rhs)
-
-        return expr
-
-    def addition(self) -> Expr:
-        expr = self.multiplication()
-
-        while self.match(TT.PLUS, TT.MINUS):
-            operator = self.previous()
-            rhs = self.multiplication()
-            expr = Binary(operator, expr, rhs)
-
-        return expr
-
-    def multiplication(self) -> Expr:
-        expr = self.unary()
-
-        while self.match(TT.STAR, TT.SLASH):
-            operator = self.previous()
-            rhs = self.unary()
-            expr = Binary(operator, expr, rhs)
 
         return expr
 
-    def unary(self) -> Expr:
-        if self.match(TT.BANG, TT.MINUS):
-            operator = self.previous()
-            rhs = self.unary()
-            return Unary(operator, rhs)
-        else:
-            return self.call()
-
     def call(self) -> Expr:
         expr = self.primary()
 
@@ -325,25 +313,26 @@ class Parser:
         return Call(expr, paren, args)
 
     def primary(self) -> Expr:
-        if self.match(TT.FALSE):
-            return Literal(False)
-        elif self.match(TT.TRUE):
-            return Literal(True)
-        elif self.match(TT.NIL):
-            return Literal(None)
+        # Most common operands first.
+        if self.match(TT.IDENTIFIER):
+            return Variable(self.previous())
         elif self.match(TT.NUMBER, TT.STRING):
             return Literal(self.previous().literal)
         elif self.match(TT.LEFT_PAREN):
             expr = self.expression()
-            self.consume(TT.RIGHT_PAREN, 'Expected \')\'')
+            self.expect(TT.RIGHT_PAREN, 'Expected \')\'')
             return Grouping(expr)
-        elif self.match(TT.IDENTIFIER):
-            return Variable(self.previous())
+        elif self.match(TT.FALSE):
+            return Literal(False)
+        elif self.match(TT.TRUE):
+            return Literal(True)
+        elif self.match(TT.NIL):
+            return Literal(None)
         elif self.match(TT.THIS):
             return ThisExpr(self.previous())
         elif self.match(TT.SUPER):
             keyword = self.previous()
-            self.consume(TT.DOT, 'Expect \'.\' after \'super\'.')
+            self.expect(TT.DOT, 'Expect \'.\' after \'super\'.')
             method = self.consume(TT.IDENTIFIER, 'Expect superclass method name')
             return SuperExpr(keyword, method)
         else:
@@ -355,6 +344,12 @@ class Parser:
         else:
             raise self.error(self.peek(), error_msg)
 
+    # Like consume(), for tokens the parser has no use for once they are
+    # there, which a StreamParser then never has to make.
+    def expect(self, type: TT, error_msg: str):
+        if not self.match(type):
+            raise self.error(self.peek(), error_msg)
+
     def error(self, token: Token, msg: str):
         self.error_reporter.parser_error(token, msg)
         return Parser.ParseError(msg)
@@ -376,9 +371,54 @@ class Parser:
                 TT.PRINT,
                 TT.RETURN
             ]
-            if self.peek().type in bndry_tokens:
+            if self.peek_type() in bndry_tokens:
                 return
             else:
                 self.advance()
 
 
+# Parses a TokenStream without turning every token into a Token: types are
+# read straight from the stream, and only tokens the parser hands on, mostly
+# into the AST, are made.
+class StreamParser(Parser):
+    def __init__(self, tokens: TokenStream, error_reporter):
+        super().__init__(tokens, error_reporter)
+        self.types = tokens.types
+        self.made_index = -1
+        self.made: Token | None = None
+
+    def at_end(self):
+        return self.types[self.curr] == EOF
+
+    def peek_type(self) -> TT:
+        return TYPES[self.types[self.curr]]
+
+    def check(self, type: TT):
+        return TYPES[self.types[self.curr]] is type
+
+    def match(self, *types: TT):
+        current = TYPES[self.types[self.curr]]
+        for type in types:
+            if current is type and type is not TT.EOF:
+                self.curr += 1
+                return True
+
+    def peek(self):
+        return self.token(self.curr)
+
+    def advance(self):
+        if self.at_end():
+            return None
+        self.curr += 1
+        return self.token(self.curr - 1)
+
+    def previous(self):
+        return self.token(self.curr - 1)
+
+    def token(self, index: int) -> Token:
+        # Made once however often it is asked for in a row, as consume()
+        # and the rules after a match() do.
+        if index != self.made_index:
+            self.made_index = index
+            self.made = self.tokens[index]
+        return self.made
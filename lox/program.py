@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from lox.ast import Stmt
+from lox.layout import FunctionLayout
+
+
+# A parsed and resolved script, which can be executed any number of times, by
+# any number of interpreters. Interpreters never change `locals`; one that has
+# to add to it, for an import, works on a copy. They do cache on the nodes:
+# a Binary node switches its class to one specialised on the operand types it
+# first sees, or that lox.infer proved, and Variable and Assign nodes keep the
+# `version` and `slot` of the global they last found. Neither changes what a
+# node means. Every Binary class computes the same result, and a cached slot
+# is only used while `version` is the very table being run in, so any other
+# interpreter just looks the global up again. Lox code on several threads
+# only runs under AsyncLox, whose baton lets one program run at a time and is
+# never handed over between a node's two cache writes.
+class Program:
+    def __init__(self, statements: list[Stmt], locals: dict[object, object], layout: FunctionLayout):
+        self.statements = tuple(statements)
+        self.locals = locals
+        self.layout = layout
@@ -1,13 +1,21 @@
 #!/usr/bin/env python
+import os
 import sys
-from pathlib import Path
 from .lox import Lox
 
-lox_interpreter = Lox()
+args = sys.argv[1:]
+stats = None
+if '--stats' in args:
+    # Only imported when asked for, to keep it out of normal start-up.
+    from .stats import Stats
+    args.remove('--stats')
+    stats = Stats()
 
+lox_interpreter = Lox(stats=stats)
 
 
 def run_file(file_name):
+    lox_interpreter.interpreter.directory = os.path.dirname(file_name)
     with open(file_name, 'r') as file:
         lox_interpreter.run(file.read())
         if lox_interpreter.had_error:
@@ -15,19 +23,21 @@ def run_file(file_name):
 
 
 def run_prompt():
+    # REPL-only modules are imported here so running a script never loads them.
     import readline
+    from .session import Session
     lox_history_filename = '.lox_history'
-    lox_history_file = Path('.lox_history')
 
-    if not lox_history_file.is_file():
-        open(lox_history_file, 'w').close()
+    if not os.path.isfile(lox_history_filename):
+        open(lox_history_filename, 'w').close()
 
     readline.read_history_file('.lox_history')
+    session = Session(lox_interpreter)
+    waiting = False
     try:
         while True:
-            print('> ', end='')
-            lox_interpreter.run(input())
-            lox_interpreter.had_error = False
+            print('. ' if waiting else '> ', end='')
+            waiting = session.feed(input())
     except (EOFError, KeyboardInterrupt) as e:
         print(f'\nShutting Down.\nReason: {repr(e)}')
     finally:
@@ -35,10 +45,15 @@ def run_prompt():
         readline.write_history_file('.lox_history')
 
 
-if len(sys.argv) > 2:
-    print('Usage: plox [script]')
+if len(args) > 1:
+    print('Usage: plox [--stats] [script]')
     sys.exit(64)
-elif len(sys.argv) == 2:
-    run_file(sys.argv[1])
-else:
-    run_prompt()
+
+try:
+    if len(args) == 1:
+        run_file(args[0])
+    else:
+        run_prompt()
+finally:
+    if stats is not None:
+        print(stats.report(), file=sys.stderr)
@@ -1,22 +1,55 @@
-from typing import Any, Dict, List
+from __future__ import annotations
 
 from lox.ast import StmtOperation, ExprOperation, Block, Stmt, Var, Expr, Variable, Assign, Function, Unary, Binary, \
-    Grouping, Logical, Expression, Print, IfElse, WhileLoop, ReturnStmt, Call, ClassDecl, Get, SetProp, ThisExpr, \
-    SuperExpr
-from lox.interpreter import Interpreter
+    Grouping, Logical, Expression, Print, IfElse, WhileLoop, ForLoop, ReturnStmt, Call, ClassDecl, Get, SetProp, ThisExpr, \
+    SuperExpr, ImportStmt
+from lox.layout import Access, CELL, FunctionLayout, LOCAL, UPVALUE
 from lox.token import Token
 from lox.util import FunctionKind, ClassType
 
 
+class LocalVariable:
+    def __init__(self, slot: int):
+        # Shared by every use in the declaring function, so marking the
+        # variable captured later on turns all of them into cell accesses.
+        self.access = Access(LOCAL, slot)
+        self.defined = False
+
+
+# The function, or script top level, whose frame the scopes from `base`
+# onwards allocate their slots in.
+class FunctionScope:
+    def __init__(self, enclosing: FunctionScope | None, layout: FunctionLayout, base: int):
+        self.enclosing = enclosing
+        self.layout = layout
+        self.base = base
+        self.upvalues: dict[LocalVariable, Access] = {}
+
+
+# Records in `locals`, for every variable use, assignment and local
+# declaration, the Access it resolves to, and for every function its
+# FunctionLayout. Unresolved names are globals.
 class Resolver(ExprOperation, StmtOperation):
-    def __init__(self, interpreter: Interpreter):
-        self.interpreter = interpreter
-        self.error_reporter = interpreter.error_reporter
-        self.scopes: List[Dict[str, bool]] = []
+    def __init__(self, error_reporter, locals: dict[object, object]):
+        self.error_reporter = error_reporter
+        self.locals = locals
+        self.scopes: list[dict[str, LocalVariable]] = []
+        # How many blocks, branches, loops and functions the statement being
+        # resolved is inside of. Blocks that declare nothing push no scope, so
+        # the scopes alone can't tell the top level apart.
+        self.depth = 0
+        self.function_scope: FunctionScope | None = None
         self.current_function = FunctionKind.NONE
         self.current_class = ClassType.NONE
 
-    def resolve_stmts(self, statements: List[Stmt]):
+    def resolve_script(self, statements: list[Stmt]) -> FunctionLayout:
+        layout = FunctionLayout()
+        self.function_scope = FunctionScope(None, layout, len(self.scopes))
+        self.resolve_stmts(statements)
+        self.function_scope = None
+        return layout
+
+    def resolve_stmts(self, statements: list[Stmt]):
         for statement in statements:
             self.resolve_stmt(statement)
 
@@ -26,25 +59,62 @@ class Resolver(ExprOperation, StmtOperation):
     def resolve_expr(self, expr: Expr):
         expr.perform_operation(self)
 
+    def resolve_nested(self, statement: Stmt):
+        self.depth += 1
+        self.resolve_stmt(statement)
+        self.depth -= 1
+
     def resolve_function(self, function: Function, kind: FunctionKind):
         enclosing_fun = self.current_function
         self.current_function = kind
 
+        has_this = kind in (FunctionKind.METHOD, FunctionKind.INITIALIZER)
+        layout = FunctionLayout(has_this)
+        self.function_scope = FunctionScope(self.function_scope, layout, len(self.scopes))
+
+        self.depth += 1
         self.begin_scope()
+        params = [self.declare_slot('this')] if has_this else []
         for param in function.params:
-            self.declare(param)
+            params.append(self.declare(param))
             self.define(param)
 
         self.resolve_stmts(function.body.statements)
         self.end_scope()
+        self.depth -= 1
 
+        layout.cells = [param.access.index for param in params if param.access.kind == CELL]
+        self.function_scope = self.function_scope.enclosing
         self.current_function = enclosing_fun
+        return layout
 
     def resolve_local(self, expr, token):
-        for (i, scope) in enumerate(reversed(self.scopes)):
-            if token.lexeme in scope:
-                self.interpreter.resolve(expr, i)
-                break
+        access = self.lookup(token.lexeme)
+        if access is not None:
+            self.locals[expr] = access
+
+    def lookup(self, name: str) -> Access | None:
+        for i in range(len(self.scopes) - 1, -1, -1):
+            variable = self.scopes[i].get(name)
+            if variable is not None:
+                if i >= self.function_scope.base:
+                    return variable.access
+                variable.access.kind = CELL
+                return self.upvalue(self.function_scope, variable, i)
+        return None
+
+    def upvalue(self, function_scope: FunctionScope, variable: LocalVariable, depth: int) -> Access:
+        access = function_scope.upvalues.get(variable)
+        if access is None:
+            enclosing = function_scope.enclosing
+            if depth >= enclosing.base:
+                function_scope.layout.upvalues.append((True, variable.access.index))
+            else:
+                index = self.upvalue(enclosing, variable, depth).index
+                function_scope.layout.upvalues.append((False, index))
+            access = Access(UPVALUE, len(function_scope.layout.upvalues) - 1)
+            function_scope.upvalues[variable] = access
+        return access
 
     def begin_scope(self):
         self.scopes.append({})
@@ -52,16 +122,25 @@ class Resolver(ExprOperation, StmtOperation):
     def end_scope(self):
         self.scopes.pop()
 
-    def declare(self, name: Token):
+    def declare(self, name: Token) -> LocalVariable | None:
         if len(self.scopes) != 0:
             scope = self.scopes[-1]
             if name.lexeme in scope:
                 self.error_reporter.parser_error(name, 'Variable with this name has already been declared in this scope.')
-            scope[name.lexeme] = False
+            variable = LocalVariable(self.function_scope.layout.allocate())
+            scope[name.lexeme] = variable
+            return variable
+        return None
+
+    def declare_slot(self, name: str) -> LocalVariable:
+        variable = LocalVariable(self.function_scope.layout.allocate())
+        variable.defined = True
+        self.scopes[-1][name] = variable
+        return variable
 
     def define(self, name: Token):
         if len(self.scopes) != 0:
-            self.scopes[-1][name.lexeme] = True
+            self.scopes[-1][name.lexeme].defined = True
 
     def on_this_expr(self, thisexpr: ThisExpr):
         if self.current_class is ClassType.NONE:
@@ -77,38 +156,40 @@ class Resolver(ExprOperation, StmtOperation):
         self.resolve_expr(setprop.expr)
 
     def on_class_decl(self, classdecl: ClassDecl):
-        self.declare(classdecl.name)
+        name = self.declare(classdecl.name)
         self.define(classdecl.name)
 
+        # 'super' is a local of the scope the class is declared in, which
+        # every method that uses it captures. 'this' is slot 0 of each method.
+        superclass = None
         if classdecl.superclass is not None:
             if classdecl.superclass.name.lexeme == classdecl.name.lexeme:
                 self.error_reporter.parser_error(classdecl.superclass.name, 'A class cannot inherit from itself.')
             self.resolve_expr(classdecl.superclass)
 
             self.begin_scope()
-            self.scopes[-1]['super'] = True
-
-
-        self.begin_scope()
+            superclass = self.declare_slot('super')
 
         self.current_class = ClassType.CLASS if classdecl.superclass is None else ClassType.SUBCLASS
-        self.scopes[-1]['this'] = True
 
         for method in classdecl.methods:
             function_kind = FunctionKind.INITIALIZER if method.name.lexeme == 'init' else FunctionKind.METHOD
-            self.resolve_function(method, function_kind)
+            self.locals[method] = self.resolve_function(method, function_kind)
 
         self.current_class = ClassType.NONE
-        self.end_scope()
         if classdecl.superclass is not None:
             self.end_scope()
 
+        self.locals[classdecl] = (name.access if name is not None else None,
+                                  superclass.access if superclass is not None else None)
+
     def on_super_expr(self, superexpr: SuperExpr):
         if self.current_class is ClassType.NONE:
             self.error_reporter.parser_error(superexpr.keyword, 'Cannot use \'super\' outside class.')
         elif self.current_class is ClassType.CLASS:
             self.error_reporter.parser_error(superexpr.keyword, 'Cannot use \'super\' in a class with no superclass.')
-        self.resolve_local(superexpr, superexpr.keyword)
+        else:
+            self.locals[superexpr] = (self.lookup('super'), self.lookup('this'))
 
     def on_literal(self, literal):
         pass
@@ -127,7 +208,7 @@ class Resolver(ExprOperation, StmtOperation):
         lexeme = variable.name.lexeme
         if len(self.scopes) != 0:
             scope = self.scopes[-1]
-            if lexeme in scope and scope[lexeme] == False:
+            if lexeme in scope and not scope[lexeme].defined:
                 self.error_reporter.parser_error(variable.name, 'Cannot read local variable in its own initializer.')
 
         self.resolve_local(variable, variable.name)
@@ -152,32 +233,62 @@ class Resolver(ExprOperation, StmtOperation):
         self.resolve_expr(print.expr)
 
     def on_var(self, var: Var):
-        self.declare(var.name)
+        variable = self.declare(var.name)
 
         if var.initializer is not None:
             self.resolve_expr(var.initializer)
 
         self.define(var.name)
+        if variable is not None:
+            self.locals[var] = variable.access
 
     def on_block(self, block: Block):
-        self.begin_scope()
-        self.resolve_stmts(block.statements)
-        self.end_scope()
+        # A block that declares nothing, like most loop bodies and branches,
+        # would only add an empty scope for every lookup inside it to skip.
+        self.depth += 1
+        if not any(isinstance(statement, (Var, Function, ClassDecl)) for statement in block.statements):
+            self.resolve_stmts(block.statements)
+        else:
+            self.begin_scope()
+            self.resolve_stmts(block.statements)
+            self.end_scope()
+        self.depth -= 1
 
     def on_function(self, function: Function):
-        self.declare(function.name)
+        variable = self.declare(function.name)
         self.define(function.name)
 
-        self.resolve_function(function, FunctionKind.FUNCTION)
+        layout = self.resolve_function(function, FunctionKind.FUNCTION)
+        layout.target = variable.access if variable is not None else None
+        self.locals[function] = layout
 
     def on_if_else(self, ifelse: IfElse):
         self.resolve_expr(ifelse.condition)
-        self.resolve_stmt(ifelse.then_statement)
-        self.resolve_stmt(ifelse.else_statement)
+        self.resolve_nested(ifelse.then_statement)
+        self.resolve_nested(ifelse.else_statement)
 
     def on_while_loop(self, whileloop: WhileLoop):
         self.resolve_expr(whileloop.condition)
-        self.resolve_stmt(whileloop.body)
+        self.resolve_nested(whileloop.body)
+
+    def on_for_loop(self, forloop: ForLoop):
+        # The initializer's variable is scoped to the loop, and shared by all
+        # of its iterations.
+        self.depth += 1
+        self.begin_scope()
+        if forloop.initializer is not None:
+            self.resolve_stmt(forloop.initializer)
+        self.resolve_expr(forloop.condition)
+        self.resolve_stmt(forloop.body)
+        if forloop.increment is not None:
+            self.resolve_expr(forloop.increment)
+        self.end_scope()
+        self.depth -= 1
+
+    def on_import_stmt(self, importstmt: ImportStmt):
+        # A module's globals become globals of the importer.
+        if self.depth != 0:
+            self.error_reporter.parser_error(importstmt.keyword, 'Can only import at the top level.')
 
     def on_return_stmt(self, returnstmt: ReturnStmt):
         if self.current_function is FunctionKind.NONE:
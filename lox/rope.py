@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+# Concatenations shorter than this stay plain Python strings; copying them is
+# cheaper than keeping track of their parts.
+MIN_ROPE_LENGTH = 256
+
+
+# A string built by `+` whose parts are only joined when its value is needed.
+# Ropes created by appending to the same rope share one parts list, each rope
+# seeing the first `count` entries of it, so `s = s + x;` in a loop appends in
+# place instead of copying `s` every iteration.
+class LoxRope:
+    def __init__(self, parts: list[str], count: int, length: int):
+        self.parts = parts
+        self.count = count
+        self.length = length
+        self.flat = None
+
+    def __str__(self):
+        if self.flat is None:
+            self.flat = ''.join(self.parts[:self.count])
+            # Later appends to this rope start from the joined string.
+            self.parts = [self.flat]
+            self.count = 1
+        return self.flat
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if isinstance(other, (str, LoxRope)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other):
+        return concat(self, other)
+
+    def __radd__(self, other):
+        return concat(other, self)
+
+
+def concat(lhs, rhs):
+    length = len(lhs) + len(rhs)
+    if length < MIN_ROPE_LENGTH:
+        return str(lhs) + str(rhs)
+
+    rhs = str(rhs)
+    if isinstance(lhs, LoxRope):
+        parts = lhs.parts
+        if lhs.count != len(parts):
+            # Another rope already appended to `lhs`, so branch off a copy.
+            parts = parts[:lhs.count]
+        parts.append(rhs)
+        return LoxRope(parts, len(parts), length)
+    else:
+        return LoxRope([lhs, rhs], 2, length)
@@ -1,4 +1,6 @@
-from typing import List, Optional
+from __future__ import annotations
+
+import sys
 
 from .token import Token
 from .token_type import TokenType as TT
@@ -7,13 +9,13 @@ from .token_type import TokenType as TT
 class Scanner:
     def __init__(self, source: str, error_reporter):
         self.source = source
-        self.tokens: List[Token] = []
+        self.tokens: list[Token] = []
         self.start = 0
         self.current = 0
         self.line = 1
         self.error_reporter = error_reporter
 
-    def scan_tokens(self) -> List[Token]:
+    def scan_tokens(self) -> list[Token]:
         while not self.at_end():
             self.start = self.current
             self.scan_token()
@@ -81,16 +83,18 @@ class Scanner:
             while (not self.at_end()) and self.peek() != '"':
                 self.advance()
             self.current += 1
-            self.add_token(TT.STRING, self.source[self.start + 1: self.current - 1])
+            self.add_token(TT.STRING, sys.intern(self.source[self.start + 1: self.current - 1]))
         elif c.isalpha():
             while (not self.at_end()) and self.peek().isalnum():
                 self.advance()
 
-            lexeme = self.get_lexeme()
+            # Interned so every occurrence of a name shares one string, which
+            # keeps environment and field dict lookups on the identity fast path.
+            lexeme = sys.intern(self.get_lexeme())
             if lexeme in keywords:
-                self.add_token(keywords[lexeme])
+                self.add_token(keywords[lexeme], lexeme=lexeme)
             else:
-                self.add_token(TT.IDENTIFIER)
+                self.add_token(TT.IDENTIFIER, lexeme=lexeme)
         elif c == '\n':
             self.line += 1
         elif c in [' ', '\r', '\t']:
@@ -98,8 +102,9 @@ class Scanner:
         else:
             self.error_reporter.error(self.line, f'Invalid character {c}.')
 
-    def add_token(self, token: TT, literal = None):
-        lexeme = self.get_lexeme()
+    def add_token(self, token: TT, literal = None, lexeme: str | None = None):
+        if lexeme is None:
+            lexeme = self.get_lexeme()
         self.tokens.append(Token(token, lexeme, literal, self.line))
 
     def get_lexeme(self):
@@ -109,7 +114,7 @@ class Scanner:
         while (peek := self.peek()) is not None and peek.isnumeric():
             self.advance()
 
-    def peek(self) -> Optional[str]:
+    def peek(self) -> str | None:
         if self.at_end():
             return None
         else:
@@ -144,6 +149,7 @@ keywords = {
     'fun': TT.FUN,
     'for': TT.FOR,
     'if': TT.IF,
+    'import': TT.IMPORT,
     'nil': TT.NIL,
     'or': TT.OR,
     'print': TT.PRINT,
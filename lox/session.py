@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from .lox import Lox
+from .scanner import Scanner
+from .token_type import TokenType as TT
+
+# Number of compiled inputs kept around for when the same input is entered again.
+PROGRAM_CACHE_SIZE = 256
+
+
+class SilentReporter:
+    def error(self, line: int, message: str):
+        pass
+
+
+# An interactive session on one Lox instance. Input is buffered until its
+# brackets and strings are closed, and each complete input is resolved into
+# the session's resolution table and run on its interpreter.
+class Session:
+    def __init__(self, lox: Lox = None):
+        self.lox = lox if lox is not None else Lox()
+        self.pending: list[str] = []
+        self.programs = OrderedDict()
+
+    def feed(self, line: str) -> bool:
+        # Returns whether the session is waiting for more lines.
+        self.pending.append(line)
+        source = '\n'.join(self.pending)
+        if not Session.is_complete(source):
+            return True
+
+        self.pending = []
+        self.run(source)
+        return False
+
+    def run(self, source: str):
+        program = self.programs.get(source)
+        if program is None:
+            program = self.lox.compile(source, self.lox.resolver)
+            if program is None:
+                self.lox.had_error = False
+                return
+            self.programs[source] = program
+            if len(self.programs) > PROGRAM_CACHE_SIZE:
+                self.programs.popitem(last=False)
+        else:
+            self.programs.move_to_end(source)
+
+        self.lox.interpreter.interpret(program)
+
+    def load(self, path: str):
+        with open(path, 'r') as file:
+            self.run(file.read())
+
+    @staticmethod
+    def is_complete(source: str) -> bool:
+        depth = 0
+        for token in Scanner(source, SilentReporter()).scan_tokens():
+            if token.type in (TT.LEFT_PAREN, TT.LEFT_BRACE):
+                depth += 1
+            elif token.type in (TT.RIGHT_PAREN, TT.RIGHT_BRACE):
+                depth -= 1
+            elif token.type == TT.STRING and (len(token.lexeme) < 2 or not token.lexeme.endswith('"')):
+                return False
+        return depth <= 0
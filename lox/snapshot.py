@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import gc
+import io
+import pickle
+import sys
+
+from lox.ast import Expr, Stmt
+from lox.environment import Environment
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+
+# Bumped whenever the pickled form of interpreter objects changes.
+SNAPSHOT_VERSION = 3
+
+# Closures keep their captured cells and ASTs alive, which pickle walks
+# recursively.
+RECURSION_LIMIT = 20000
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# Also pauses the cyclic garbage collector, which otherwise runs over and over
+# as (un)pickling allocates hundreds of thousands of objects that are all live.
+class PickleContext:
+    def __enter__(self):
+        self.limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(self.limit, RECURSION_LIMIT))
+        self.gc_enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *exc):
+        sys.setrecursionlimit(self.limit)
+        if self.gc_enabled:
+            gc.enable()
+
+
+# Saves an interpreter's global environment, which holds every class,
+# function and captured cell the prelude created, together with the
+# resolution data of the AST nodes those reach. That data is pickled after the
+# globals with the same pickler, whose memo keeps the nodes identical.
+def save(interpreter: Interpreter, path: str):
+    reached = {}
+
+    class SnapshotPickler(pickle.Pickler):
+        def reducer_override(self, obj):
+            if isinstance(obj, (Expr, Stmt)) and obj in interpreter.locals:
+                reached[obj] = interpreter.locals[obj]
+            return NotImplemented
+
+    file = io.BytesIO()
+    pickler = SnapshotPickler(file, pickle.HIGHEST_PROTOCOL)
+    try:
+        with PickleContext():
+            pickler.dump(SNAPSHOT_VERSION)
+            pickler.dump(interpreter.globals)
+            pickler.dump(reached)
+    except (pickle.PicklingError, TypeError) as e:
+        raise SnapshotError(f'Cannot snapshot interpreter: {e}')
+
+    with open(path, 'wb') as snapshot:
+        snapshot.write(file.getvalue())
+
+
+def load(path: str) -> tuple[Environment, dict[object, object]]:
+    with open(path, 'rb') as snapshot, PickleContext():
+        unpickler = pickle.Unpickler(snapshot)
+        version = unpickler.load()
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f'Snapshot {path} has version {version}, expected {SNAPSHOT_VERSION}.')
+        globals = unpickler.load()
+        locals = unpickler.load()
+    return globals, locals
+
+
+def restore(lox: Lox, path: str):
+    globals, locals = load(path)
+    interpreter = lox.interpreter
+    interpreter.globals = globals
+    interpreter.locals.update(locals)
+
+
+def main(argv):
+    if len(argv) == 3 and argv[0] == 'save':
+        lox = Lox()
+        with open(argv[1], 'r') as file:
+            lox.run(file.read())
+        if lox.had_error or lox.had_runtime_error:
+            return 65 if lox.had_error else 70
+        save(lox.interpreter, argv[2])
+    elif len(argv) == 3 and argv[0] == 'run':
+        lox = Lox()
+        restore(lox, argv[1])
+        with open(argv[2], 'r') as file:
+            lox.run(file.read())
+        if lox.had_error:
+            return 65
+    else:
+        print('Usage: python -m lox.snapshot save <prelude> <snapshot>\n'
+              '       python -m lox.snapshot run <snapshot> <script>')
+        return 64
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from lox.ast import Binary, Unary
+from lox.rope import LoxRope
+from lox.token_type import TokenType as TT
+
+# A Binary node rewrites itself, by switching its class, the first time it is
+# evaluated: into one of the specialised classes below if its operands were
+# both numbers, or both strings for `+`, and into GenericBinary otherwise.
+# Specialised nodes skip the operator dispatch and operand checks of
+# Interpreter.on_binary behind a single guard on the operand types. When that
+# guard fails they deoptimise into GenericBinary for good, so a node never
+# flips back and forth.
+#
+# The Number* classes and StringConcat have no guard at all. lox.infer
+# switches nodes to them at compile time when it has proven the operand types.
+# Only the interpreter evaluates any of these classes.
+
+
+class GenericBinary(Binary):
+    pass
+
+
+class FloatAdd(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_add(self)
+
+
+class FloatSubtract(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_subtract(self)
+
+
+class FloatMultiply(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_multiply(self)
+
+
+class FloatDivide(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_divide(self)
+
+
+class FloatGreater(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_greater(self)
+
+
+class FloatGreaterEqual(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_greater_equal(self)
+
+
+class FloatLess(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_less(self)
+
+
+class FloatLessEqual(Binary):
+    def perform_operation(self, operation):
+        return operation.on_float_less_equal(self)
+
+
+class StringAdd(Binary):
+    def perform_operation(self, operation):
+        return operation.on_string_add(self)
+
+
+class NumberAdd(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_add(self)
+
+
+class NumberSubtract(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_subtract(self)
+
+
+class NumberMultiply(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_multiply(self)
+
+
+class NumberDivide(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_divide(self)
+
+
+class NumberGreater(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_greater(self)
+
+
+class NumberGreaterEqual(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_greater_equal(self)
+
+
+class NumberLess(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_less(self)
+
+
+class NumberLessEqual(Binary):
+    def perform_operation(self, operation):
+        return operation.on_number_less_equal(self)
+
+
+class StringConcat(Binary):
+    def perform_operation(self, operation):
+        return operation.on_string_concat(self)
+
+
+class NumberNegate(Unary):
+    def perform_operation(self, operation):
+        return operation.on_number_negate(self)
+
+
+FLOAT_SPECIALIZATIONS = {
+    TT.PLUS: FloatAdd,
+    TT.MINUS: FloatSubtract,
+    TT.STAR: FloatMultiply,
+    TT.SLASH: FloatDivide,
+    TT.GREATER: FloatGreater,
+    TT.GREATER_EQUAL: FloatGreaterEqual,
+    TT.LESS: FloatLess,
+    TT.LESS_EQUAL: FloatLessEqual,
+}
+
+
+NUMBER_OPERATIONS = {
+    TT.PLUS: NumberAdd,
+    TT.MINUS: NumberSubtract,
+    TT.STAR: NumberMultiply,
+    TT.SLASH: NumberDivide,
+    TT.GREATER: NumberGreater,
+    TT.GREATER_EQUAL: NumberGreaterEqual,
+    TT.LESS: NumberLess,
+    TT.LESS_EQUAL: NumberLessEqual,
+}
+
+
+def specialization(operator: TT, lhs, rhs) -> type[Binary]:
+    if isinstance(lhs, float) and isinstance(rhs, float):
+        return FLOAT_SPECIALIZATIONS.get(operator, GenericBinary)
+    if operator == TT.PLUS and isinstance(lhs, (str, LoxRope)) and isinstance(rhs, (str, LoxRope)):
+        return StringAdd
+    return GenericBinary
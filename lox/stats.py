@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+PHASES = ('scan', 'parse', 'resolve', 'infer', 'execute')
+
+
+# Opt-in runtime statistics. Interpreters and Lox instances only count while
+# they have one of these as `stats`; otherwise every counting site is a single
+# `is None` check. Memory is traced from construction on, which slows down
+# allocation-heavy scripts considerably, so leave `trace_memory` off when only
+# the timings matter.
+class Stats:
+    def __init__(self, trace_memory: bool = True):
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.calls = 0
+        self.frames = 0
+        self.cells = 0
+        self.closures = 0
+        self.bound_methods = 0
+        self.instances = 0
+        self.property_lookups = 0
+        self.specializations = 0
+        self.deoptimizations = 0
+
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def lap(self, phase: str, start: float) -> float:
+        # Adds the time since `start` to `phase` and returns the time now, for
+        # timing the next phase.
+        now = time.perf_counter()
+        self.seconds[phase] += now - start
+        return now
+
+    def peak_memory(self) -> int | None:
+        if not self.trace_memory or not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()[1]
+
+    def counters(self) -> dict[str, int]:
+        return {
+            'calls': self.calls,
+            'frames': self.frames,
+            'cells': self.cells,
+            'closures': self.closures,
+            'bound methods': self.bound_methods,
+            'instances': self.instances,
+            'property lookups': self.property_lookups,
+            'specializations': self.specializations,
+            'deoptimizations': self.deoptimizations,
+        }
+
+    def report(self) -> str:
+        lines = [f'{phase + ":":<18}{seconds * 1000:>12.1f} ms' for phase, seconds in self.seconds.items()]
+        lines.extend(f'{name + ":":<18}{count:>12}' for name, count in self.counters().items())
+        peak = self.peak_memory()
+        if peak is not None:
+            lines.append(f'{"peak memory:":<18}{peak / 1024:>12.0f} KiB')
+        return '\n'.join(lines)
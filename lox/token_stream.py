@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+from array import array
+
+from .scanner import Scanner, keywords
+from .token import Token
+from .token_type import TokenType as TT
+
+# Token types by their value, which is what a TokenStream stores.
+TYPES: list[TT | None] = [None] * (max(token_type.value for token_type in TT) + 1)
+for token_type in TT:
+    TYPES[token_type.value] = token_type
+
+# Values of the types whose lexemes the Scanner interns.
+NAMES = {TT.IDENTIFIER.value, *(token_type.value for token_type in keywords.values())}
+NUMBER = TT.NUMBER.value
+STRING = TT.STRING.value
+EOF = TT.EOF.value
+
+
+# The tokens of a source as parallel arrays of their types, start and end
+# offsets and lines: 13 bytes a token, where a list of Token objects costs
+# over a hundred, with a lexeme string on top. Lexemes and literals are only
+# sliced out of the source when a Token is made for an index, which a
+# StreamParser only does for the tokens that end up in the AST.
+class TokenStream:
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+
+    def append(self, type: TT, start: int, end: int, line: int):
+        self.types.append(type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def __len__(self):
+        return len(self.types)
+
+    def type_at(self, index: int) -> TT:
+        return TYPES[self.types[index]]
+
+    def __getitem__(self, index: int) -> Token:
+        code = self.types[index]
+        line = self.lines[index]
+        if code == EOF:
+            return Token(TT.EOF, None, None, line)
+
+        start, end = self.starts[index], self.ends[index]
+        lexeme = self.source[start:end]
+        if code in NAMES:
+            return Token(TYPES[code], sys.intern(lexeme), None, line)
+        elif code == NUMBER:
+            return Token(TT.NUMBER, lexeme, float(lexeme), line)
+        elif code == STRING:
+            return Token(TT.STRING, lexeme, sys.intern(self.source[start + 1:end - 1]), line)
+        return Token(TYPES[code], lexeme, None, line)
+
+
+# Scans into a TokenStream instead of a list of Tokens.
+class CompactScanner(Scanner):
+    def __init__(self, source: str, error_reporter):
+        super().__init__(source, error_reporter)
+        self.stream = TokenStream(source)
+
+    def scan_tokens(self) -> TokenStream:
+        while not self.at_end():
+            self.start = self.current
+            self.scan_token()
+
+        self.stream.append(TT.EOF, self.current, self.current, self.line)
+        return self.stream
+
+    def add_token(self, token: TT, literal=None, lexeme: str | None = None):
+        self.stream.append(token, self.start, self.current, self.line)
@@ -1,11 +1,14 @@
 from enum import Enum
 
+from lox.rope import LoxRope
 from lox.token import Token
 
 
 def stringified(val):
     if isinstance(val, str):
         return f'{val}'
+    elif isinstance(val, LoxRope):
+        return str(val)
     elif isinstance(val, float):
         return f'{val:g}'
     elif isinstance(val, bool):
@@ -38,3 +41,15 @@ class LoxRuntimeError(RuntimeError):
     def __init__(self, token: Token, msg: str):
         super(RuntimeError, self).__init__(msg)
         self.token = token
+
+
+class BudgetKind(Enum):
+    STEPS = 'step'
+    TIME = 'time'
+    ALLOCATIONS = 'allocation'
+
+
+class LoxBudgetError(LoxRuntimeError):
+    def __init__(self, token: Token, kind: BudgetKind, limit):
+        super().__init__(token, f'Exceeded {kind.value} budget of {limit}.')
+        self.kind = kind
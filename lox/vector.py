@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from lox.callable import NativeFunction, VARIADIC
+from lox.util import LoxRuntimeError
+
+
+def numpy():
+    # NumPy is only imported the first time a vector is built, so scalar-only
+    # scripts never pay for it.
+    try:
+        import numpy
+    except ImportError:
+        raise LoxRuntimeError(None, 'Vectors require NumPy, which is not installed.')
+    return numpy
+
+
+class LoxVector:
+    def __init__(self, array):
+        self.array = array
+
+    def __str__(self):
+        formatter = {'float_kind': lambda x: f'{x:g}'}
+        return numpy().array2string(self.array, separator=', ', formatter=formatter)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __eq__(self, other):
+        return isinstance(other, LoxVector) and numpy().array_equal(self.array, other.array)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return self.elementwise(other, lambda a, b: a + b)
+
+    def __radd__(self, other):
+        return self.elementwise(other, lambda a, b: b + a)
+
+    def __sub__(self, other):
+        return self.elementwise(other, lambda a, b: a - b)
+
+    def __rsub__(self, other):
+        return self.elementwise(other, lambda a, b: b - a)
+
+    def __mul__(self, other):
+        return self.elementwise(other, lambda a, b: a * b)
+
+    def __rmul__(self, other):
+        return self.elementwise(other, lambda a, b: b * a)
+
+    def __truediv__(self, other):
+        return self.elementwise(other, lambda a, b: a / b)
+
+    def __rtruediv__(self, other):
+        return self.elementwise(other, lambda a, b: b / a)
+
+    def elementwise(self, other, operation):
+        other = other.array if isinstance(other, LoxVector) else other
+        with numpy().errstate(divide='ignore', invalid='ignore'):
+            return LoxVector(operation(self.array, other))
+
+
+def is_vector_operation(lhs, rhs) -> bool:
+    if not (isinstance(lhs, LoxVector) or isinstance(rhs, LoxVector)):
+        return False
+    return isinstance(lhs, (float, LoxVector)) and isinstance(rhs, (float, LoxVector))
+
+
+def lengths_match(lhs, rhs) -> bool:
+    return not (isinstance(lhs, LoxVector) and isinstance(rhs, LoxVector)) or len(lhs) == len(rhs)
+
+
+def vector_arg(val: object) -> LoxVector:
+    if not isinstance(val, LoxVector):
+        raise LoxRuntimeError(None, 'Expected vector argument.')
+    return val
+
+
+def number_arg(val: object) -> float:
+    if not isinstance(val, float):
+        raise LoxRuntimeError(None, 'Expected number argument.')
+    return val
+
+
+def index_arg(val: object) -> int:
+    index = number_arg(val)
+    if not index.is_integer():
+        raise LoxRuntimeError(None, 'Vector index must be a whole number.')
+    return int(index)
+
+
+def vector(*values):
+    np = numpy()
+    parts = []
+    for val in values:
+        if isinstance(val, LoxVector):
+            parts.append(val.array)
+        else:
+            parts.append(np.array([number_arg(val)]))
+
+    if not parts:
+        return LoxVector(np.empty(0))
+    return LoxVector(np.concatenate(parts))
+
+
+def vector_range(start, stop, step):
+    if number_arg(step) == 0:
+        raise LoxRuntimeError(None, 'Vector range step cannot be zero.')
+    return LoxVector(numpy().arange(number_arg(start), number_arg(stop), step, dtype=float))
+
+
+def vector_load(path):
+    if not isinstance(path, str):
+        raise LoxRuntimeError(None, 'Expected file path string.')
+    try:
+        return LoxVector(numpy().loadtxt(path, dtype=float, ndmin=1).ravel())
+    except (OSError, ValueError) as e:
+        raise LoxRuntimeError(None, f'Could not load vector from \'{path}\': {e}')
+
+
+def non_empty_arg(vec, name: str):
+    array = vector_arg(vec).array
+    if len(array) == 0:
+        raise LoxRuntimeError(None, f'Cannot take {name} of an empty vector.')
+    return array
+
+
+def sum_(vec):
+    return float(vector_arg(vec).array.sum())
+
+
+def min_(vec):
+    return float(non_empty_arg(vec, 'min').min())
+
+
+def max_(vec):
+    return float(non_empty_arg(vec, 'max').max())
+
+
+def mean(vec):
+    return float(non_empty_arg(vec, 'mean').mean())
+
+
+def dot(lhs, rhs):
+    lhs, rhs = vector_arg(lhs), vector_arg(rhs)
+    if len(lhs) != len(rhs):
+        raise LoxRuntimeError(None, f'Vector lengths {len(lhs)} and {len(rhs)} do not match.')
+    return float(numpy().dot(lhs.array, rhs.array))
+
+
+def slice_(vec, start, end):
+    vec = vector_arg(vec)
+    return LoxVector(vec.array[index_arg(start):index_arg(end)].copy())
+
+
+def at(vec, index):
+    vec = vector_arg(vec)
+    i = index_arg(index)
+    if not -len(vec) <= i < len(vec):
+        raise LoxRuntimeError(None, f'Vector index {i} out of range.')
+    return float(vec.array[i])
+
+
+def length(vec):
+    return float(len(vector_arg(vec)))
+
+
+def define_natives(environment):
+    natives = [
+        NativeFunction('vector', VARIADIC, vector),
+        NativeFunction('vectorRange', 3, vector_range),
+        NativeFunction('vectorLoad', 1, vector_load),
+        NativeFunction('sum', 1, sum_),
+        NativeFunction('min', 1, min_),
+        NativeFunction('max', 1, max_),
+        NativeFunction('mean', 1, mean),
+        NativeFunction('dot', 2, dot),
+        NativeFunction('slice', 3, slice_),
+        NativeFunction('at', 2, at),
+        NativeFunction('len', 1, length),
+    ]
+    for native in natives:
+        environment.define(native.name, native)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from lox.lox import Lox
+from lox.output import Output
+
+TEXT = 'héllo\nwörld ✓\r\nlast'
+
+
+def run(source: str) -> tuple[Lox, str]:
+    output = io.StringIO()
+    lox = Lox(output=Output(output))
+    lox.run(source)
+    return lox, output.getvalue()
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_bytes(TEXT.encode())
+    return path
+
+
+def opened(kind: str, path) -> str:
+    return f'openFile("{path}", "r")' if kind == 'openFile' else f'mapFile("{path}")'
+
+
+@pytest.mark.parametrize('kind', ['openFile', 'mapFile'])
+def test_chunks_count_characters(path, kind):
+    lox, output = run(f'''
+var file = {opened(kind, path)};
+var chunk = readChunk(file, 2);
+while (chunk != nil) {{
+    print chunk;
+    chunk = readChunk(file, 2);
+}}
+close(file);
+''')
+    assert not lox.had_runtime_error
+    assert output.split('\n')[:3] == ['hé', 'll', 'o']
+    assert ''.join(output.split('\n')) == TEXT.replace('\n', '')
+
+
+@pytest.mark.parametrize('kind', ['openFile', 'mapFile'])
+@pytest.mark.parametrize('size', [1, 2, 8])
+def test_lines_after_a_chunk(path, kind, size):
+    # With a size of 1 the chunk read stops in the middle of the bytes of é.
+    lox, output = run(f'''
+var file = {opened(kind, path)};
+print readChunk(file, {size});
+var line = readLine(file);
+while (line != nil) {{
+    print line;
+    line = readLine(file);
+}}
+close(file);
+''')
+    assert not lox.had_runtime_error
+    first, rest = TEXT[:size], TEXT[size:]
+    lines = rest.split('\n')
+    assert output == '\n'.join([first, *(line.rstrip('\r') for line in lines)]) + '\n'
+
+
+def test_chunk_after_a_line(path):
+    lox, output = run(f'''
+var file = mapFile("{path}");
+print readChunk(file, 1);
+print readLine(file);
+print readChunk(file, 2);
+print readChunk(file, 100);
+print readChunk(file, 1);
+close(file);
+''')
+    assert not lox.had_runtime_error
+    assert output == 'h\néllo\nwö\nrld ✓\r\nlast\nnil\n'
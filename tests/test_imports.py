@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import os
+import pickle
+
+import pytest
+
+from lox import modules
+from lox.lox import Lox
+from lox.output import Output
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = tmp_path / 'util.lox'
+    path.write_text('var answer = 42;\nfun double(n) { return n * 2; }\n')
+    yield path
+    modules.imported.clear()
+    modules.modules.clear()
+    modules.compiled.clear()
+
+
+def run(source: str, directory) -> tuple[Lox, str]:
+    output = io.StringIO()
+    lox = Lox(output=Output(output))
+    lox.interpreter.directory = str(directory)
+    lox.run(source)
+    return lox, output.getvalue()
+
+
+def test_import_defines_module_globals(library):
+    lox, output = run('import "util.lox";\nprint double(answer);\n', library.parent)
+    assert not lox.had_error and not lox.had_runtime_error
+    assert output == '84\n'
+
+
+@pytest.mark.parametrize('source', [
+    '{ import "util.lox"; }',
+    '{ var x = 1; import "util.lox"; }',
+    'if (true) { import "util.lox"; }',
+    'if (false) print 1; else { import "util.lox"; }',
+    'while (false) { import "util.lox"; }',
+    'for (;false;) { import "util.lox"; }',
+    'fun f() { import "util.lox"; }',
+])
+def test_import_only_at_top_level(library, capsys, source):
+    lox, output = run(source, library.parent)
+    assert lox.had_error
+    assert 'Can only import at the top level.' in capsys.readouterr().out
+    assert os.path.abspath(library) not in modules.modules
+
+
+def test_execute_leaves_program_untouched(library, monkeypatch):
+    # Executed programs import relative to the working directory.
+    monkeypatch.chdir(library.parent)
+    output = io.StringIO()
+    lox = Lox(output=Output(output))
+    program = lox.compile('import "util.lox";\nprint double(answer);\n')
+    locals = dict(program.locals)
+    lox.execute(program)
+    lox.execute(program)
+    assert program.locals == locals
+    assert output.getvalue() == '84\n84\n'
+
+
+def test_module_functions_from_nested_imports(library):
+    (library.parent / 'nested.lox').write_text('import "util.lox";\nfun quadruple(n) { return double(double(n)); }\n')
+    lox, output = run('import "nested.lox";\nprint quadruple(answer);\n', library.parent)
+    assert not lox.had_error and not lox.had_runtime_error
+    assert output == '168\n'
+
+
+def cache_file(library) -> str:
+    # The one entry the first import wrote.
+    run('import "util.lox";', library.parent)
+    directory = library.parent / modules.CACHE_DIRECTORY
+    [entry] = directory.iterdir()
+    modules.imported.clear()
+    modules.modules.clear()
+    modules.compiled.clear()
+    return entry
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:3],
+    lambda data: b'garbage',
+    lambda data: b'\x80\x09.',
+    lambda data: data[:2] + bytes(len(data) - 2),
+    lambda data: pickle.dumps(modules.CACHE_VERSION) + pickle.dumps({'not': 'a program'}),
+])
+def test_damaged_cache_is_a_miss(library, damage):
+    entry = cache_file(library)
+    entry.write_bytes(damage(entry.read_bytes()))
+    lox, output = run('import "util.lox";\nprint double(answer);\n', library.parent)
+    assert not lox.had_error and not lox.had_runtime_error
+    assert output == '84\n'
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+from lox.aio import AsyncLox
+from lox.budget import Limits
+from lox.lox import Lox
+from lox.output import Output
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(source: str, limits: Limits | None = None) -> tuple[Lox, str]:
+    output = io.StringIO()
+    lox = Lox(limits, output=Output(output))
+    lox.run(source)
+    return lox, output.getvalue()
+
+
+def test_spawn_sends_globals_of_captured_closures():
+    lox, output = run('''
+var base = 10;
+fun make() {
+    fun helper(x) { return x + base; }
+    fun work(n) { return helper(n); }
+    return work;
+}
+var w = make();
+print w(1);
+print join(spawn(w, 1));
+''')
+    assert not lox.had_runtime_error
+    assert output == '11\n11\n'
+
+
+def test_spawn_sends_globals_of_functions_in_maps():
+    lox, output = run('''
+var base = 10;
+fun add(x) { return x + base; }
+fun call(map) { return get(map, "f")(2); }
+print join(spawn(call, hashMap("f", add)));
+''')
+    assert not lox.had_runtime_error
+    assert output == '12\n'
+
+
+def test_spawn_in_a_batch_worker(tmp_path):
+    # Batch workers are daemonic, so they can't start a pool of their own.
+    # The batch runs in a process of its own, as forking its pool here could
+    # catch the pool of an earlier test mid-way.
+    script = tmp_path / 'spawn.lox'
+    script.write_text('fun square(x) { return x * x; }\nprint join(spawn(square, 7));\n')
+    summary = tmp_path / 'summary.json'
+    result = subprocess.run([sys.executable, '-m', 'lox.batch', '--summary', str(summary), str(script)],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stdout
+    assert json.loads(summary.read_text())[0]['output'] == '49\n'
+
+
+def test_join_keeps_to_the_time_budget(capsys):
+    start = time.perf_counter()
+    lox, output = run('fun spin() { while (true) {} }\nprint join(spawn(spin));\n', Limits(max_seconds=0.5))
+    assert time.perf_counter() - start < 5
+    assert lox.had_runtime_error
+    assert 'Exceeded time budget of 0.5s.' in capsys.readouterr().out
+
+
+def test_spawned_calls_keep_to_the_step_budget(capsys):
+    lox, output = run('''
+fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+print join(spawn(fib, 20));
+''', Limits(max_steps=1000))
+    assert lox.had_runtime_error
+    assert 'Exceeded step budget of 1000.' in capsys.readouterr().out
+
+
+def test_join_under_asynclox_lets_other_programs_run(capsys):
+    lox = Lox()
+    ticker = lox.compile('for (var i = 0; i < 5; i = i + 1) sleep(0.05);')
+    joiner = lox.compile('fun spin() { while (true) {} }\nprint join(spawn(spin));')
+
+    async def timed(program, limits=None):
+        start = time.perf_counter()
+        ok = await async_lox.execute(program, limits=limits)
+        return ok, time.perf_counter() - start
+
+    async def main():
+        return await asyncio.gather(timed(joiner, Limits(max_seconds=1)), timed(ticker))
+
+    async_lox = AsyncLox()
+    (joined, _), (ticked, ticker_seconds) = asyncio.run(main())
+    assert not joined and ticked
+    # The ticker would otherwise wait for the joiner's whole second.
+    assert ticker_seconds < 0.8
+    assert 'Exceeded time budget of 1s.' in capsys.readouterr().out
@@ -4,14 +4,14 @@ from pathlib import Path
 from typing import List, Sized
 
 expr_template = [
-    'Literal | value: Any',
+    'Literal | value: object',
     'Unary | operator: Token, expr: Expr',
     'Binary | operator: Token, left: Expr, right: Expr',
     'Grouping | expr: Expr',
-    'Variable | name: Token',
-    'Assign | identifier: Token, value: Expr',
+    'Variable | name: Token, version: object = None, slot: int = 0',
+    'Assign | identifier: Token, value: Expr, version: object = None, slot: int = 0',
     'Logical | operator: Token, left: Expr, right: Expr',
-    'Call | callee: Expr, paren: Token, args: List[Expr]',
+    'Call | callee: Expr, paren: Token, args: list[Expr]',
     'Get | expr: Expr, name: Token',
     'SetProp | expr: Expr, name: Token, value: Expr',
     'ThisExpr | keyword: Token',
@@ -21,13 +21,15 @@ expr_template = [
 stmt_template = [
     'Expression | expr: Expr',
     'Print | expr: Expr',
-    'Var | name: Token, initializer: Optional[Expr]',
-    'Block | statements: List[Stmt]',
-    'Function | name: Token, params: List[Token], body: Block',
+    'Var | name: Token, initializer: Expr | None',
+    'Block | statements: list[Stmt]',
+    'Function | name: Token, params: list[Token], body: Block',
     'IfElse | condition: Expr, then_statement: Stmt, else_statement: Stmt',
-    "WhileLoop | condition: Expr, body: Stmt",
-    'ReturnStmt | keyword: Token, value: Optional[Expr]',
-    'ClassDecl | name: Token, superclass: Optional[Variable], methods: List[Function]'
+    "WhileLoop | keyword: Token, condition: Expr, body: Stmt",
+    'ForLoop | keyword: Token, initializer: Stmt | None, condition: Expr, increment: Expr | None, body: Stmt',
+    'ReturnStmt | keyword: Token, value: Expr | None',
+    'ClassDecl | name: Token, superclass: Variable | None, methods: list[Function]',
+    'ImportStmt | keyword: Token, path: Token'
 ]
 
 camelCase_to_snake_case_regex = re.compile(r'(?<!^)(?=[A-Z])')
@@ -41,8 +43,9 @@ def main(argv):
         sys.exit(1)
 
     with open(argv[1], 'w') as ofile:
-        ast = '''from abc import ABC, abstractmethod
-from typing import Any, List, Optional
+        ast = '''from __future__ import annotations
+
+from abc import ABC, abstractmethod
 from lox.token import Token
 '''
         ast += '\n\n'
@@ -65,7 +68,7 @@ class {parent_class}(ABC):
     ast = parent_class_declaration
     class_list = []
     for template in templates:
-        class_, *init_arguments_list = map(lambda x: x.strip(' '), template.split('|'))
+        class_, *init_arguments_list = map(lambda x: x.strip(' '), template.split('|', 1))
         class_list.append(class_)
         assert len(init_arguments_list) == 1
         init_arguments = init_arguments_list[0]